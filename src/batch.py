@@ -0,0 +1,187 @@
+'''
+Vectorized evaluation of many boards at once.
+Needs NumPy, `results()` falls back to `Board.result()` without it.
+'''
+from board import Board
+from lines import DIRECTIONS
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# cell and result codes in batch arrays
+EMPTY = 0
+X = 1
+O = -1
+TIE = 2
+SIGNS = {'X': X, 'O': O, None: EMPTY}
+NAMES = {X: 'X', O: 'O', TIE: 'Tie', EMPTY: None}
+
+
+class BoardBatch:
+    '''
+    B boards of the same shape kept in one int8 array of shape (B, rows, cols).
+    Cells are `X`, `O` or `EMPTY`.
+
+    :param cells: int8 array of shape (B, rows, cols).
+    :param k: signs in a row to win, equals to smaller side by default.
+    '''
+
+    def __init__(self, cells: 'np.ndarray', k: int | None = None) -> None:
+        if np is None:
+            raise ImportError('BoardBatch needs NumPy')
+        self._cells = np.asarray(cells, dtype=np.int8)
+        _, rows, cols = self._cells.shape
+        self._k = k or min(rows, cols)
+        # X moves when both signs were placed equal times
+        balance = self._cells.reshape(len(self._cells), -1).sum(axis=1)
+        self._turn = np.where(balance == 0, X, O).astype(np.int8)
+
+    @staticmethod
+    def empty(count: int, rows: int = 3, cols: int | None = None, k: int | None = None) -> 'BoardBatch':
+        '''
+        Creates batch of empty boards.
+
+        :param count: boards in batch.
+        '''
+        if np is None:
+            raise ImportError('BoardBatch needs NumPy')
+        return BoardBatch(np.zeros((count, rows, cols or rows), dtype=np.int8), k)
+
+    @staticmethod
+    def from_boards(boards: list[Board]) -> 'BoardBatch':
+        '''
+        Copies boards of the same shape and k into batch.
+        '''
+        if np is None:
+            raise ImportError('BoardBatch needs NumPy')
+        shape, k = boards[0].get_shape(), boards[0].get_k()
+        if any(board.get_shape() != shape or board.get_k() != k for board in boards):
+            raise ValueError('boards must have the same shape and k')
+        cells = np.array([[SIGNS[sign] for sign in board] for board in boards], dtype=np.int8)
+        return BoardBatch(cells.reshape(len(boards), *shape), k)
+
+    def to_boards(self) -> list[Board]:
+        '''
+        Converts batch back to `Board` objects.
+        Turn order on the board is not known, so signs are placed X first.
+        '''
+        _, rows, cols = self._cells.shape
+        boards = []
+        for cells in self._cells:
+            board = Board(rows, cols, self._k)
+            xs = list(zip(*np.nonzero(cells == X)))
+            os = list(zip(*np.nonzero(cells == O)))
+            for n in range(len(xs) + len(os)):
+                i, j = xs[n // 2] if n % 2 == 0 else os[n // 2]
+                board.turn(int(i), int(j))
+            boards.append(board)
+        return boards
+
+    def get_cells(self) -> 'np.ndarray':
+        '''
+        Returns cells array, shape (B, rows, cols).
+        '''
+        return self._cells
+
+    def get_turn(self) -> 'np.ndarray':
+        '''
+        Returns sign to move (`X` or `O`) of every board.
+        '''
+        return self._turn
+
+    def legal(self) -> 'np.ndarray':
+        '''
+        Returns bool array of empty cells, shape (B, rows, cols).
+        '''
+        return self._cells == EMPTY
+
+    def line_sums(self) -> list['np.ndarray']:
+        '''
+        Sums signs along every winning segment of every board.
+        Segment sums are added from k shifted views of the cells array.
+
+        :return: int16 array per direction of `lines.DIRECTIONS`,
+            shape (B, segment starts along rows, segment starts along columns).
+        '''
+        _, rows, cols = self._cells.shape
+        k = self._k
+        sums = []
+        for di, dj in DIRECTIONS:
+            height = rows - di * (k - 1)
+            width = cols - abs(dj) * (k - 1)
+            if height <= 0 or width <= 0:
+                continue
+            # the first cell of anti diagonal segment is its rightmost one
+            left = (k - 1) if dj < 0 else 0
+            total = np.zeros((len(self._cells), height, width), dtype=np.int16)
+            for n in range(k):
+                i, j = di * n, left + dj * n
+                total += self._cells[:, i:i + height, j:j + width]
+            sums.append(total)
+        return sums
+
+    def winners(self) -> 'np.ndarray':
+        '''
+        Returns sign having k in a row on every board.
+
+        :return: int8 array of `X`, `O` or `EMPTY` if nobody has k in a row.
+        '''
+        x_won = np.zeros(len(self._cells), dtype=bool)
+        o_won = np.zeros(len(self._cells), dtype=bool)
+        for sums in self.line_sums():
+            sums = sums.reshape(len(sums), -1)
+            x_won |= (sums == self._k).any(axis=1)
+            o_won |= (sums == -self._k).any(axis=1)
+        return np.where(x_won, X, np.where(o_won, O, EMPTY)).astype(np.int8)
+
+    def results(self) -> 'np.ndarray':
+        '''
+        Returns game result of every board.
+
+        :return: int8 array of `X`, `O`, `TIE` or `EMPTY` if game is not finished.
+        '''
+        winners = self.winners()
+        full = ~self.legal().reshape(len(self._cells), -1).any(axis=1)
+        return np.where((winners == EMPTY) & full, TIE, winners).astype(np.int8)
+
+    def turn(self, cells: 'np.ndarray', mask: 'np.ndarray | None' = None) -> None:
+        '''
+        Makes one turn on every board.
+        Occupied cells are ignored as `Board.turn()` does.
+
+        :param cells: int array of (i, j) cells, shape (B, 2).
+        :param mask: bool array of boards to make turn on, all by default.
+        '''
+        index = np.arange(len(self._cells))
+        i, j = cells[:, 0], cells[:, 1]
+        placed = self._cells[index, i, j] == EMPTY
+        if mask is not None:
+            placed &= mask
+        self._cells[index[placed], i[placed], j[placed]] = self._turn[placed]
+        self._turn[placed] = -self._turn[placed]
+
+    def random_moves(self, rng: 'np.random.Generator') -> 'np.ndarray':
+        '''
+        Chooses random empty cell on every board.
+        Boards without empty cells get (0, 0).
+
+        :return: int array of (i, j) cells, shape (B, 2).
+        '''
+        count, rows, cols = self._cells.shape
+        weights = rng.random((count, rows * cols)) * self.legal().reshape(count, -1)
+        return np.stack(np.divmod(weights.argmax(axis=1), cols), axis=1)
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+
+def results(boards: list[Board]) -> list[str | None]:
+    '''
+    Returns game results of boards as `Board.result()` does.
+    Boards are evaluated as one batch if NumPy is installed.
+    '''
+    if np is None or not boards:
+        return [board.result() for board in boards]
+    return [NAMES[int(code)] for code in BoardBatch.from_boards(boards).results()]
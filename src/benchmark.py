@@ -0,0 +1,308 @@
+'''
+Benchmarks of board, bot and drawing hot paths and board memory.
+
+Results are printed and written as JSON. With a baseline file every
+result is compared with it and the run fails if any result got worse
+than `--tolerance`.
+
+Usage:
+    python benchmark.py --output results.json --save-baseline ../benchmarks/baseline.json
+    python benchmark.py --output results.json --baseline ../benchmarks/baseline.json
+'''
+import argparse
+import gc
+import json
+import os
+import pickle
+import random
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from bitboard import BitBoard
+from board import Board
+from bots import DIFFICULTIES
+from server import Session
+
+SHAPES = ((3, 3, 3), (4, 4, 4), (7, 7, 5), (15, 15, 5))
+# search bots get work budgets, so their latency is not just the time limit
+BOT_BUDGETS = {
+    'Hard': {'time_limit': 60.0, 'max_nodes': 2000},
+    'MCTS': {'time_limit': 60.0, 'playouts': 200},
+}
+
+
+def random_games(rows: int, cols: int, k: int, count: int, seed: int = 0) -> list[list[tuple[int, int]]]:
+    '''
+    Returns move lists of random finished games.
+    '''
+    rng = random.Random(seed)
+    games = []
+    for _ in range(count):
+        board = Board(rows, cols, k)
+        cells = [(i, j) for i in range(rows) for j in range(cols)]
+        rng.shuffle(cells)
+        for cell in cells:
+            board.turn(*cell)
+            if board.result() is not None:
+                break
+        games.append(board.get_moves())
+    return games
+
+
+def measure(function: Callable[[], int], seconds: float, repeats: int = 3) -> float:
+    '''
+    Calls function repeatedly for about `seconds` split into repeats.
+
+    :param function: returns count of done operations.
+    :param repeats: count of runs, the fastest one is taken.
+    :return: operations per second.
+    '''
+    best = 0.0
+    for _ in range(repeats):
+        done = 0
+        start = time.perf_counter()
+        while (elapsed := time.perf_counter() - start) < seconds / repeats:
+            done += function()
+        best = max(best, done / elapsed)
+    return best
+
+
+def percentile(values: list[float], part: float) -> float:
+    '''
+    Returns value below which `part` of sorted values lie.
+    '''
+    values = sorted(values)
+    return values[min(int(part * len(values)), len(values) - 1)]
+
+
+def bench_board(seconds: float) -> dict[str, dict]:
+    '''
+    Measures turns and result checks per second.
+    '''
+    results = {}
+    for rows, cols, k in SHAPES:
+        shape = f'{rows}x{cols}x{k}'
+        games = random_games(rows, cols, k, 100)
+
+        def turns() -> int:
+            done = 0
+            for moves in games:
+                board = Board(rows, cols, k)
+                for cell in moves:
+                    board.turn(*cell)
+                done += len(moves)
+            return done
+
+        boards = []
+        for moves in games:
+            board = Board(rows, cols, k)
+            for cell in moves[:len(moves) // 2]:
+                board.turn(*cell)
+            boards.append(board)
+
+        def checks() -> int:
+            for board in boards:
+                board.is_winner('X')
+                board.is_winner('O')
+                board.is_tie()
+            return len(boards) * 3
+
+        results[f'board.turn[{shape}]'] = _result(measure(turns, seconds), 'moves/s')
+        results[f'board.checks[{shape}]'] = _result(measure(checks, seconds), 'checks/s')
+    return results
+
+
+def bench_memory(count: int = 1000) -> dict[str, dict]:
+    '''
+    Measures memory taken by live half-played games and size of their pickles,
+    and memory of server sessions holding such games.
+    '''
+    results = {}
+    for rows, cols, k in SHAPES:
+        shape = f'{rows}x{cols}x{k}'
+        games = [moves[:len(moves) // 2] for moves in random_games(rows, cols, k, count)]
+        for cls in (Board, BitBoard):
+            # tables shared by boards of the same shape are not counted
+            cls(rows, cols, k)
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            boards = []
+            for moves in games:
+                board = cls(rows, cols, k)
+                for cell in moves:
+                    board.turn(*cell)
+                boards.append(board)
+            used = tracemalloc.get_traced_memory()[0] - before
+            tracemalloc.stop()
+            pickled = sum(len(pickle.dumps(board)) for board in boards)
+            name = cls.__name__
+            results[f'memory.{name}[{shape}]'] = _result(used / count, 'bytes', False)
+            results[f'pickle.{name}[{shape}]'] = _result(pickled / count, 'bytes', False)
+        # games held by server, without connections
+        Session(BitBoard(rows, cols, k), None, None)
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        sessions = []
+        for moves in games:
+            session = Session(BitBoard(rows, cols, k), None, None)
+            for cell in moves:
+                session.turn(*cell)
+            sessions.append(session)
+        used = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        results[f'memory.Session[{shape}]'] = _result(used / count, 'bytes', False)
+    return results
+
+
+def bench_bots(samples: int, difficulties: list[str], repeats: int = 3) -> dict[str, dict]:
+    '''
+    Measures decision latency of bots on random positions.
+    Search bots work within `BOT_BUDGETS`.
+
+    :param samples: positions per bot and board.
+    :param repeats: turns timed on every position, the fastest one is taken.
+    '''
+    results = {}
+    for difficulty in difficulties:
+        for rows, cols, k in SHAPES[:3]:
+            shape = f'{rows}x{cols}x{k}'
+            latencies = []
+            for moves in random_games(rows, cols, k, samples, seed=1):
+                board = Board(rows, cols, k)
+                for cell in moves[:len(moves) // 2]:
+                    board.turn(*cell)
+                best = None
+                for _ in range(repeats):
+                    bot = DIFFICULTIES[difficulty](board.get_turn(), board, **BOT_BUDGETS.get(difficulty, {}))
+                    gc.collect()
+                    begin = time.perf_counter()
+                    bot.get_move()
+                    elapsed = (time.perf_counter() - begin) * 1000
+                    best = elapsed if best is None else min(best, elapsed)
+                latencies.append(best)
+            for part in (0.5, 0.9, 0.99):
+                name = f'bot.turn[{difficulty},{shape}].p{int(part * 100)}'
+                value = percentile(latencies, part)
+                # tail of sub-0.1 ms timings is scheduler noise
+                results[name] = _result(value, 'ms', False, gated=part < 0.99 or value >= 0.1)
+    return results
+
+
+def bench_draw(seconds: float) -> dict[str, dict]:
+    '''
+    Measures frame time of `Game.draw` with dummy SDL video driver.
+    '''
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    import pygame
+    from gameplayerplayerlocal import GamePlayerPlayerLocal
+
+    pygame.init()
+    results = {}
+    # frame time should not grow with the board
+    for rows, cols, k in SHAPES + ((19, 19, 5),):
+        shape = f'{rows}x{cols}x{k}'
+        game = GamePlayerPlayerLocal(240, 260, 10, (rows, cols), k)
+        game._surface = pygame.display.set_mode((240, 260))
+        game.start()
+        moves = random_games(rows, cols, k, 1)[0]
+
+        def full() -> int:
+            game.request_redraw()
+            game.draw()
+            return 1
+
+        def turn() -> int:
+            game._board = game.new_board()
+            game._state = game.State.Running
+            game.request_redraw()
+            game.draw()
+            for cell in moves[:-1]:
+                game._board.turn(*cell)
+                game.draw()
+            return len(moves) - 1
+
+        results[f'game.draw.full[{shape}]'] = _result(1000 / measure(full, seconds), 'ms', False)
+        results[f'game.draw.turn[{shape}]'] = _result(1000 / measure(turn, seconds), 'ms', False)
+    pygame.quit()
+    return results
+
+
+def _result(value: float, unit: str, higher_is_better: bool = True, gated: bool = True) -> dict:
+    '''
+    :param gated: whether slowdown of result fails comparison with baseline.
+    '''
+    return {'value': value, 'unit': unit, 'higher_is_better': higher_is_better, 'gated': gated}
+
+
+def compare(
+    results: dict[str, dict],
+    baseline: dict[str, dict],
+    tolerance: float,
+    min_delta: float = 0.01,
+) -> list[str]:
+    '''
+    Compares results with baseline.
+    Results not gated in both runs are skipped.
+
+    :param tolerance: allowed relative slowdown.
+    :param min_delta: smallest change of timings in ms counted as slowdown.
+    :return: descriptions of regressions.
+    '''
+    regressions = []
+    for name, result in results.items():
+        if (base := baseline.get(name)) is None or base['value'] == 0:
+            continue
+        if not (result.get('gated', True) or base.get('gated', True)):
+            continue
+        if result['unit'] == 'ms' and abs(result['value'] - base['value']) < min_delta:
+            continue
+        change = result['value'] / base['value'] - 1
+        if not result['higher_is_better']:
+            change = -change
+        if change < -tolerance:
+            regressions.append(
+                f"{name}: {result['value']:.4g} {result['unit']}"
+                f" vs baseline {base['value']:.4g} ({change:+.1%})"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmarks board, bots and drawing.')
+    parser.add_argument('--seconds', type=float, default=0.5, help='time per benchmark')
+    parser.add_argument('--bots', nargs='*', default=['Easy', 'Hard'], help='bot difficulties to measure')
+    parser.add_argument('--bot-samples', type=int, default=200, help='positions per bot and board')
+    parser.add_argument('--no-draw', action='store_true', help='skip drawing benchmarks')
+    parser.add_argument('--no-memory', action='store_true', help='skip memory benchmarks')
+    parser.add_argument('--output', default=None, help='file to write JSON results')
+    parser.add_argument('--baseline', default=None, help='JSON results to compare with')
+    parser.add_argument('--save-baseline', default=None, help='file to write results as new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative slowdown')
+    parser.add_argument('--min-delta', type=float, default=0.01, help='smallest counted change of timings in ms')
+    args = parser.parse_args()
+
+    results = bench_board(args.seconds)
+    results |= bench_bots(args.bot_samples, args.bots)
+    if not args.no_memory:
+        results |= bench_memory()
+    if not args.no_draw:
+        results |= bench_draw(args.seconds)
+    for name, result in results.items():
+        print(f"{name:<40} {result['value']:>14.4g} {result['unit']}")
+
+    for path in (args.output, args.save_baseline):
+        if path is not None:
+            with open(path, 'w') as file:
+                json.dump(results, file, indent=2)
+    if args.baseline is not None:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance, args.min_delta)
+        if regressions:
+            print('Regressions:', *regressions, sep='\n  ')
+            sys.exit(1)
+        print('No regressions.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+import struct
+from functools import cache
+from collections.abc import Iterator
+from lines import segments, cell_segments, neighbours
+
+
+@cache
+def line_masks(rows: int, cols: int, k: int) -> tuple[int, ...]:
+    '''
+    Returns bit masks of every winning segment on the board.
+
+    :param rows: cells along the first board index.
+    :param cols: cells along the second board index.
+    :param k: cells in a row required to win.
+    :return: tuple of masks in the order of `lines.segments()`.
+    '''
+    return tuple(
+        sum(1 << (i * cols + j) for i, j in segment)
+        for segment in segments(rows, cols, k)
+    )
+
+
+@cache
+def cell_masks(rows: int, cols: int, k: int) -> tuple[tuple[int, ...], ...]:
+    '''
+    Returns winning segment masks passing through every cell.
+
+    :param rows: cells along the first board index.
+    :param cols: cells along the second board index.
+    :param k: cells in a row required to win.
+    :return: tuple indexed by cell bit index of tuples of masks.
+    '''
+    masks = line_masks(rows, cols, k)
+    return tuple(
+        tuple(masks[line] for line in cell)
+        for row in cell_segments(rows, cols, k)
+        for cell in row
+    )
+
+
+@cache
+def neighbour_masks(rows: int, cols: int) -> tuple[int, ...]:
+    '''
+    Returns bit mask of cells around every cell.
+
+    :param rows: cells along the first board index.
+    :param cols: cells along the second board index.
+    :return: tuple indexed by cell bit index.
+    '''
+    return tuple(sum(1 << other for other in cell) for cell in neighbours(rows, cols))
+
+
+# rows, cols, k, winner code
+HEADER = struct.Struct('<BBBB')
+WINNERS = (None, 'X', 'O')
+
+
+class BitBoard:
+    '''
+    TicTacToe board object backed by one integer bitmask,
+    X signs take bits of cell indexes and O signs the bits above them.
+    Has the same interface as `board.Board`.
+    Takes under 200 bytes per game, so many live games can be kept in memory,
+    and is serialized with `to_bytes()` to 4 bytes plus 2 bits per cell.
+
+    :param size: cells in row / column on the board.
+    :param cols: cells in column if board is not square.
+    :param k: signs in a row to win, equals to smaller side by default.
+    '''
+
+    __slots__ = ('_turn', '_size', '_cols', '_k', '_cell_masks', '_bits', '_winner')
+
+    def __init__(self, size: int = 3, cols: int | None = None, k: int | None = None) -> None:
+        self._turn = 'X'
+        self._size = size
+        self._cols = cols or size
+        self._k = k or min(self._size, self._cols)
+        # shared between boards of the same shape
+        self._cell_masks = cell_masks(self._size, self._cols, self._k)
+        self._bits = 0
+        self._winner = None
+
+    def to_bytes(self) -> bytes:
+        '''
+        Returns position as header and X and O bitmasks.
+        '''
+        cells = self._size * self._cols
+        size = (cells + 7) // 8
+        return (
+            HEADER.pack(self._size, self._cols, self._k, WINNERS.index(self._winner))
+            + (self._bits & (1 << cells) - 1).to_bytes(size, 'little')
+            + (self._bits >> cells).to_bytes(size, 'little')
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'BitBoard':
+        '''
+        Restores board written by `to_bytes()`.
+
+        :raises ValueError: if data is not a board.
+        '''
+        if len(data) < HEADER.size:
+            raise ValueError('board data is too short')
+        rows, cols, k, winner = HEADER.unpack_from(data)
+        size = (rows * cols + 7) // 8
+        if len(data) != HEADER.size + 2 * size or winner >= len(WINNERS):
+            raise ValueError('bad board data')
+        x = int.from_bytes(data[HEADER.size:HEADER.size + size], 'little')
+        o = int.from_bytes(data[HEADER.size + size:], 'little')
+        if (x | o) >> rows * cols or x & o:
+            raise ValueError('bad board data')
+        board = cls(rows, cols, k)
+        board._bits = x | o << rows * cols
+        board._winner = WINNERS[winner]
+        board._turn = 'X' if x.bit_count() == o.bit_count() else 'O'
+        return board
+
+    def __reduce__(self):
+        return BitBoard.from_bytes, (self.to_bytes(),)
+
+    def get(self, i: int, j: int) -> str | None:
+        '''
+        Returns symbol ('X' or 'O' or None) from cell.
+
+        :param i: row of board
+        :param j: column of board
+
+        :return: sign in cell ('X' or 'O' or None)
+        '''
+        index = i * self._cols + j
+        if self._bits >> index & 1:
+            return 'X'
+        if self._bits >> (index + self._size * self._cols) & 1:
+            return 'O'
+        return None
+
+    def turn(self, i: int, j: int) -> str:
+        '''
+        Controls players turns.
+
+        :param i: column of board
+        :param j: row of board
+        :return: Return next turn sign ('X' or 'O')
+        '''
+        index = i * self._cols + j
+        cells = self._size * self._cols
+        bits = self._bits
+        if (bits | bits >> cells) >> index & 1:
+            return self._turn
+        sign = self._turn
+        shift = 0 if sign == 'X' else cells
+        bits |= 1 << (index + shift)
+        self._bits = bits
+        if self._winner is None:
+            bits >>= shift
+            for mask in self._cell_masks[index]:
+                if bits & mask == mask:
+                    self._winner = sign
+                    break
+        self._turn = 'O' if sign == 'X' else 'X'
+        return self._turn
+
+    def legal_moves(self, nearby: bool = False, ordered: bool = False) -> Iterator[tuple[int, int]]:
+        '''
+        Generates empty cells in board order.
+        Count of them is `count_empty()`.
+
+        :param nearby: only cells next to signs, all empty cells if there are no such cells.
+        :param ordered: cells with more signs around first, then cells closer to the centre.
+        :return: generator of (i, j) cells.
+        '''
+        rows, cols = self._size, self._cols
+        size = rows * cols
+        occupied = (self._bits | self._bits >> size) & (1 << size) - 1
+        cells = (index for index in range(size) if not occupied >> index & 1)
+        masks = neighbour_masks(rows, cols)
+        if nearby and occupied:
+            cells = (index for index in cells if occupied & masks[index])
+        if ordered:
+            cells = sorted(cells, key=lambda index: (
+                -(occupied & masks[index]).bit_count(),
+                abs(2 * (index // cols) - rows + 1) + abs(2 * (index % cols) - cols + 1),
+                index,
+            ))
+        for index in cells:
+            yield divmod(index, cols)
+
+    def result(self) -> str | None:
+        '''
+        Returns game result known after the last turn.
+
+        :return: "X" or "O" if one of them won.
+        :return: "Tie" if there are no empty cells.
+        :return: None if game is not finished.
+        '''
+        if self._winner is not None:
+            return self._winner
+        if self.is_tie():
+            return 'Tie'
+        return None
+
+    def count_empty(self) -> int:
+        '''
+        Returns count of empty cells.
+        '''
+        return self._size * self._cols - self._bits.bit_count()
+
+    def is_tie(self) -> bool:
+        '''
+        Checks if game is tie.
+        You have to check the winner first.
+
+        :return: True if game is tie else False
+        '''
+        return self._bits.bit_count() == self._size * self._cols
+
+    def is_winner(self, sign: str) -> bool:
+        '''
+        Checks if `sign` won the game.
+
+        :return: True if winner have sign.
+        '''
+        return self._winner == sign
+
+    def get_turn(self) -> str:
+        '''
+        Returns current turn.
+
+        :return: current turn sign ('X' or 'O')
+        '''
+        return self._turn
+
+    def get_size(self) -> int:
+        '''
+        Return board size.
+
+        :return: size (one dimension) of the board.
+        '''
+        return self._size
+
+    def get_shape(self) -> tuple[int, int]:
+        '''
+        Returns board dimensions.
+
+        :return: (cells in row, cells in column) of the board.
+        '''
+        return self._size, self._cols
+
+    def get_k(self) -> int:
+        '''
+        Returns signs in a row required to win.
+
+        :return: length of winning segment.
+        '''
+        return self._k
+
+    def get_segments(self) -> tuple[tuple[tuple[int, int], ...], ...]:
+        '''
+        Returns all winning segments of the board.
+
+        :return: tuple of segments, each segment is a tuple of (i, j) cells.
+        '''
+        return segments(self._size, self._cols, self._k)
+
+    def get_row(self, row: int) -> list[str | None]:
+        '''
+        Returns row of the board.
+
+        :param row: row index to return.
+        :return: list of signs ('X' or 'O' or None) in the row.
+        '''
+        return [self.get(row, j) for j in range(self._cols)]
+
+    def get_col(self, col: int) -> list[str | None]:
+        '''
+        Returns columns of the board.
+
+        :param col: column index to return.
+        :return: list of signs ('X' or 'O' or None) in the columns.
+        '''
+        return [self.get(i, col) for i in range(self._size)]
+
+    def __str__(self) -> str:
+        string = ''
+        for i in range(self._size):
+            line = ''
+            for j in range(self._cols):
+                line += self.get(i, j) or '-'
+            string += '|'.join(line) + '\n'
+        return string
+
+    def __iter__(self) -> str | None:
+        for i in range(self._size):
+            yield from self.get_row(i)
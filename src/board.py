@@ -1,14 +1,49 @@
+from collections.abc import Iterator
+from lines import segments, neighbours
+from threats import Threats
+import symmetry
+from zobrist import cell_keys
+
+
 class Board:
     '''
     TicTacToe board object.
+    Supports M x N boards where K signs in a row wins.
 
     :param size: cells in row / column on the board.
+    :param cols: cells in column if board is not square.
+    :param k: signs in a row to win, equals to smaller side by default.
     '''
+    __slots__ = (
+        '_turn', '_size', '_cols', '_k', '_cells', '_segments', '_threats', '_empty',
+        '_free', '_neighbours', '_near', '_winner', '_won_at', '_zobrist', '_hashes', '_moves',
+    )
 
-    def __init__(self, size: int = 3) -> None:
+    def __init__(self, size: int = 3, cols: int | None = None, k: int | None = None) -> None:
         self._turn = 'X'
         self._size = size
-        self._cells = [[None] * self._size for _ in range(self._size)]
+        self._cols = cols or size
+        self._k = k or min(self._size, self._cols)
+        self._cells = [[None] * self._cols for _ in range(self._size)]
+        self._segments = segments(self._size, self._cols, self._k)
+        # signs count per winning segment
+        self._threats = Threats(self._cells, self._k)
+        self._empty = self._size * self._cols
+        # empty cells by flat index in board order, signs around every cell
+        self._free = dict.fromkeys(range(self._empty))
+        self._neighbours = neighbours(self._size, self._cols)
+        self._near = [0] * self._empty
+        self._winner = None
+        self._won_at = 0
+        # Zobrist hash of position for every symmetry transform
+        self._zobrist = cell_keys(self._size, self._cols)
+        self._hashes = [0] * len(self._zobrist['X'][0])
+        # flat indexes of made turns
+        self._moves = []
+
+    def __reduce__(self):
+        # counters are rebuilt from turns, so pickle keeps only them
+        return _replay, (self._size, self._cols, self._k, tuple(self._moves))
 
     def get(self, i: int, j: int) -> str | None:
         '''
@@ -24,16 +59,162 @@ class Board:
     def turn(self, i: int, j: int) -> str:
         '''
         Controls players turns.
+        Turns on occupied cells are ignored.
 
         :param i: column of board
         :param j: row of board
         :return: Return next turn sign ('X' or 'O')
         '''
         if self._cells[i][j] is None:
-            self._cells[i][j] = self._turn
-            self._turn = 'O' if self._turn == 'X' else 'X'
+            self.push(i, j)
         return self._turn
 
+    def push(self, i: int, j: int) -> None:
+        '''
+        Makes turn of current player, it can be undone with `pop()`.
+
+        :param i: column of board
+        :param j: row of board
+        :raises ValueError: if cell is occupied.
+        '''
+        sign = self._turn
+        if self._cells[i][j] is not None:
+            raise ValueError(f'cell ({i}, {j}) is occupied')
+        self._cells[i][j] = sign
+        index = i * self._cols + j
+        self._moves.append(index)
+        if self._threats.place(i, j, sign) and self._winner is None:
+            self._winner = sign
+            self._won_at = len(self._moves)
+        self._empty -= 1
+        del self._free[index]
+        for other in self._neighbours[index]:
+            self._near[other] += 1
+        hashes = self._hashes
+        for transform, key in enumerate(self._zobrist[sign][index]):
+            hashes[transform] ^= key
+        self._turn = 'O' if sign == 'X' else 'X'
+
+    def pop(self) -> tuple[int, int]:
+        '''
+        Undoes the last turn.
+
+        :return: (i, j) cell of undone turn.
+        :raises IndexError: if there are no turns.
+        '''
+        index = self._moves.pop()
+        i, j = divmod(index, self._cols)
+        sign = self._cells[i][j]
+        self._cells[i][j] = None
+        self._threats.remove(i, j, sign)
+        if self._winner is not None and len(self._moves) < self._won_at:
+            self._winner = None
+        self._empty += 1
+        self._free[index] = None
+        for other in self._neighbours[index]:
+            self._near[other] -= 1
+        hashes = self._hashes
+        for transform, key in enumerate(self._zobrist[sign][index]):
+            hashes[transform] ^= key
+        self._turn = sign
+        return i, j
+
+    def result(self) -> str | None:
+        '''
+        Returns game result known after the last turn.
+
+        :return: "X" or "O" if one of them won.
+        :return: "Tie" if there are no empty cells.
+        :return: None if game is not finished.
+        '''
+        if self._winner is not None:
+            return self._winner
+        if self._empty == 0:
+            return 'Tie'
+        return None
+
+    def canonical(self) -> tuple[int, int]:
+        '''
+        Returns canonical form of position.
+        Positions equal up to rotations and reflections have the same key.
+        Key is exact, so it is computed on call; search uses `zobrist()`.
+
+        :return: (key, transform) where transform maps cells with
+            `to_canonical()` and `from_canonical()`.
+        '''
+        return symmetry.canonical([symmetry.CODES[sign] for sign in self], self._size, self._cols)
+
+    def zobrist(self) -> tuple[int, int]:
+        '''
+        Returns 64-bit hash of position, the same for symmetric positions.
+        Hash is updated by every turn.
+
+        :return: (hash, transform) where transform maps cells as in `canonical()`.
+        '''
+        hashes = self._hashes
+        transform = min(range(len(hashes)), key=hashes.__getitem__)
+        return hashes[transform], transform
+
+    def to_canonical(self, cell: tuple[int, int], transform: int) -> tuple[int, int]:
+        '''
+        Maps cell to coordinates in canonical position.
+
+        :param cell: (i, j) cell of this board.
+        :param transform: transform returned by `canonical()` or `zobrist()`.
+        '''
+        return symmetry.to_canonical(self._size, self._cols, transform, cell)
+
+    def from_canonical(self, cell: tuple[int, int], transform: int) -> tuple[int, int]:
+        '''
+        Maps cell of canonical position to coordinates of this board.
+
+        :param cell: (i, j) cell of canonical position.
+        :param transform: transform returned by `canonical()` or `zobrist()`.
+        '''
+        return symmetry.from_canonical(self._size, self._cols, transform, cell)
+
+    def get_threats(self) -> Threats:
+        '''
+        Returns counters of signs on winning segments.
+        '''
+        return self._threats
+
+    def get_moves(self) -> list[tuple[int, int]]:
+        '''
+        Returns cells in the order turns were made.
+        '''
+        return [divmod(index, self._cols) for index in self._moves]
+
+    def legal_moves(self, nearby: bool = False, ordered: bool = False) -> Iterator[tuple[int, int]]:
+        '''
+        Generates empty cells without copying them unless `ordered` is set,
+        so board must not be changed until generator is finished.
+        Count of them is `count_empty()`.
+
+        :param nearby: only cells next to signs, all empty cells if there are no such cells.
+        :param ordered: cells with more signs around first, then cells closer to the centre,
+            then board order. Otherwise order is board order until turns are undone.
+        :return: generator of (i, j) cells.
+        '''
+        cells, near, cols = self._free, self._near, self._cols
+        if nearby and self._empty < len(near):
+            cells = (index for index in cells if near[index])
+        if ordered:
+            rows = self._size
+            cells = sorted(cells, key=lambda index: (
+                -near[index],
+                abs(2 * (index // cols) - rows + 1) + abs(2 * (index % cols) - cols + 1),
+                index,
+            ))
+        for index in cells:
+            yield divmod(index, cols)
+
+    def count_empty(self) -> int:
+        '''
+        Returns count of empty cells.
+        '''
+        return self._empty
+
     def is_tie(self) -> bool:
         '''
         Checks if game is tie.
@@ -41,10 +222,7 @@ class Board:
 
         :return: True if game is tie else False
         '''
-        ties = []
-        for row in self._cells:
-            ties.append(None not in row)
-        return all(ties)
+        return self._empty == 0
 
     def is_winner(self, sign: str) -> bool:
         '''
@@ -52,18 +230,7 @@ class Board:
 
         :return: True if winner have sign.
         '''
-        # Three in row
-        for i in range(3):
-            if all(self.get(i, j) == sign for j in range(3)):
-                return True
-            if all(self.get(j, i) == sign for j in range(3)):
-                return True
-        # Diagonals
-        if self.get(0, 0) == self.get(1, 1) == self.get(2, 2) == sign:
-            return True
-        if self.get(2, 0) == self.get(1, 1) == self.get(0, 2) == sign:
-            return True
-        return False
+        return self._winner == sign
 
     def get_turn(self) -> str:
         '''
@@ -81,6 +248,30 @@ class Board:
         '''
         return self._size
 
+    def get_shape(self) -> tuple[int, int]:
+        '''
+        Returns board dimensions.
+
+        :return: (cells in row, cells in column) of the board.
+        '''
+        return self._size, self._cols
+
+    def get_k(self) -> int:
+        '''
+        Returns signs in a row required to win.
+
+        :return: length of winning segment.
+        '''
+        return self._k
+
+    def get_segments(self) -> tuple[tuple[tuple[int, int], ...], ...]:
+        '''
+        Returns all winning segments of the board.
+
+        :return: tuple of segments, each segment is a tuple of (i, j) cells.
+        '''
+        return self._segments
+
     def get_row(self, row: int) -> list[str | None]:
         '''
         Returns row of the board.
@@ -103,7 +294,7 @@ class Board:
         string = ''
         for i in range(self._size):
             line = ''
-            for j in range(self._size):
+            for j in range(self._cols):
                 line += self._cells[i][j] or '-'
             string += '|'.join(line) + '\n'
         return string
@@ -111,3 +302,13 @@ class Board:
     def __iter__(self) -> str | None:
         for row in self._cells:
             yield from row
+
+
+def _replay(size: int, cols: int, k: int, moves: tuple[int, ...]) -> Board:
+    '''
+    Returns board after turns on flat cell indexes.
+    '''
+    board = Board(size, cols, k)
+    for index in moves:
+        board.push(*divmod(index, cols))
+    return board
@@ -0,0 +1,105 @@
+import mmap
+import os
+import struct
+from functools import cache
+from board import Board
+
+BOOKS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'books')
+
+MAGIC = b'TTTB'
+# magic, version, rows, cols, k, slots count, entries count
+HEADER = struct.Struct('<4sBBBBII')
+# key + 1 (0 marks empty slot), move index in canonical position, value
+SLOT = struct.Struct('<QBb')
+VERSION = 1
+
+
+def _slot(key: int, slots: int) -> int:
+    '''
+    Returns first slot to probe for key.
+    '''
+    return (key * 0x9E3779B97F4A7C15 & 0xFFFFFFFFFFFFFFFF) % slots
+
+
+def write_book(path: str, rows: int, cols: int, k: int, entries: dict[int, tuple[int, int]]) -> None:
+    '''
+    Writes opening book as open addressing hash table.
+
+    :param path: file to write.
+    :param entries: canonical key -> (canonical move index, value).
+    '''
+    slots = 1
+    while slots < len(entries) * 2:
+        slots *= 2
+    table = bytearray(SLOT.size * slots)
+    for key, (move, value) in entries.items():
+        slot = _slot(key, slots)
+        while SLOT.unpack_from(table, slot * SLOT.size)[0]:
+            slot = (slot + 1) % slots
+        SLOT.pack_into(table, slot * SLOT.size, key + 1, move, value)
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, rows, cols, k, slots, len(entries)))
+        file.write(table)
+
+
+class OpeningBook:
+    '''
+    Memory-mapped table of perfect moves.
+    Built by `buildbook.py`.
+
+    :param path: book file.
+    '''
+
+    def __init__(self, path: str) -> None:
+        with open(path, 'rb') as file:
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, rows, cols, k, slots, count = HEADER.unpack_from(self._data)
+        if (magic != MAGIC) or (version != VERSION):
+            raise ValueError(f'{path} is not an opening book')
+        self._shape = (rows, cols)
+        self._k = k
+        self._slots = slots
+        self._count = count
+
+    @staticmethod
+    @cache
+    def load(rows: int, cols: int, k: int) -> 'OpeningBook | None':
+        '''
+        Returns book for board parameters from `BOOKS_DIR`.
+
+        :return: OpeningBook or None if there is no book.
+        '''
+        path = os.path.join(BOOKS_DIR, f'{rows}x{cols}x{k}.book')
+        if not os.path.exists(path):
+            return None
+        return OpeningBook(path)
+
+    def get(self, key: int) -> tuple[int, int] | None:
+        '''
+        Returns entry by canonical key.
+
+        :return: (canonical move index, value) or None.
+        '''
+        slot = _slot(key, self._slots)
+        while True:
+            stored, move, value = SLOT.unpack_from(self._data, HEADER.size + slot * SLOT.size)
+            if stored == 0:
+                return None
+            if stored == key + 1:
+                return move, value
+            slot = (slot + 1) % self._slots
+
+    def lookup(self, board: Board) -> tuple[tuple[int, int], int] | None:
+        '''
+        Returns best move for board position.
+
+        :return: ((i, j) move, value for side to move) or None if position is not in book.
+        '''
+        key, transform = board.canonical()
+        if (entry := self.get(key)) is None:
+            return None
+        move, value = entry
+        return board.from_canonical(divmod(move, self._shape[1]), transform), value
+
+    def __len__(self) -> int:
+        return self._count
@@ -1,11 +1,11 @@
 from collections import Counter
 from board import Board
+from threats import Threats, scan
 
 
 class Bot:
     '''
     Bot for TicTacToe game.
-    Now supports only 3x3 field.
 
     :param sign: sign ('X' or 'O') for bot
     :param board: board to play TicTacToe.
@@ -18,55 +18,102 @@ class Bot:
         self.generate_checks()
 
     def generate_checks(self) -> None:
-        board_size = self._board.get_size()
-        self._checks = []
-        # rows
-        for i in range(board_size):
-            self._checks.append([(i, j) for j in range(board_size)])
-        # colums
-        for j in range(board_size):
-            self._checks.append([(i, j) for i in range(board_size)])
-        # diagonals
-        self._checks.append(((0, 0), (1, 1), (2, 2)))
-        self._checks.append(((0, 2), (1, 1), (2, 0)))
+        '''
+        Collects winning segments and ranks cells by count of segments through them.
+        '''
+        self._checks = self._board.get_segments()
+        rows, cols = self._board.get_shape()
+        through = Counter(cell for segment in self._checks for cell in segment)
+        self._optimal_cells = sorted(
+            ((i, j) for i in range(rows) for j in range(cols)),
+            key=lambda cell: (
+                -through[cell],
+                abs(2 * cell[0] - rows + 1) + abs(2 * cell[1] - cols + 1),
+            ),
+        )
+        # cell -> place in order of preference
+        self._rank = {cell: rank for rank, cell in enumerate(self._optimal_cells)}
 
-    def check_combination(self, line, sign: str) -> tuple[int, int] | bool:
+    def get_threats(self) -> Threats:
+        '''
+        Returns threat counters of board, boards without them are scanned.
         '''
-        Checks combination to win / prevent player win
+        if hasattr(self._board, 'get_threats'):
+            return self._board.get_threats()
+        return scan(self._board)
 
-        :param line: list of coordinates to make win
-        :param sign: which sign to win check
-        :return: cell to win on this line if win on next turn is possible. Else False
+    def get_forced_move(self) -> tuple[int, int] | None:
         '''
-        line_signs = [self._board.get(*cell) for cell in line]
-        counter = Counter(line_signs)
-        if (counter[sign] == 2) and (counter[None] == 1):
-            return line[line_signs.index(None)]
-        return False
+        Finds cell winning on this turn or blocking player win.
 
-    def turn(self) -> None:
-        if self._board.get_turn() != self._sign:
-            return
-        for check in self._checks:
-            if (cell := self.check_combination(check, self._sign)):
-                return self._board.turn(*cell)
-        for check in self._checks:
-            if (cell := self.check_combination(check, self._player_sign)):
-                return self._board.turn(*cell)
+        :return: (i, j) cell or None if there is no such cell.
+        '''
+        threats = self.get_threats()
+        for sign in (self._sign, self._player_sign):
+            if (cells := threats.winning_cells(sign)):
+                return cells[0]
+        return None
+
+    def get_fork_move(self) -> tuple[int, int] | None:
+        '''
+        Finds cell creating two winning cells or preventing player from doing it.
+
+        :return: (i, j) cell or None if there is no fork.
+        '''
+        threats = self.get_threats()
+        if (forks := threats.forks(self._sign)):
+            return forks[0]
+        if not (forks := threats.forks(self._player_sign)):
+            return None
+        if len(forks) == 1:
+            return forks[0]
+        # several forks can not be blocked by one sign, so the player is
+        # forced to block our threat in a cell which is not a fork
+        for line in threats.open_lines(self._sign, self._board.get_k() - 2):
+            cells = [cell for cell in self._board.get_segments()[line] if self._board.get(*cell) is None]
+            for cell in cells:
+                reply = cells[0] if cells[1] == cell else cells[1]
+                if reply not in forks:
+                    return cell
+        return forks[0]
+
+    def get_move(self) -> tuple[int, int] | None:
+        '''
+        Chooses cell for the next bot turn.
 
-        optimal_cells = [
-            (0, 0),  # left top corner
-            (0, 2),  # left bottom corner
-            (2, 2),  # right bottom corner
-            (2, 0),  # right top corner
-            (2, 2),  # center
-            (0, 1),  # left center cell
-            (1, 0),  # top center cell
-            (2, 1),  # right center cell
-            (1, 2),  # bottom center cell
-        ]
-        for cell in optimal_cells:
+        :return: (i, j) cell or None if there are no empty cells.
+        '''
+        if self._board.count_empty() == 0:
+            return None
+        if (cell := self.get_forced_move()) is not None:
+            return cell
+        if (cell := self.get_fork_move()) is not None:
+            return cell
+        # scan of preferred cells stops after at most all signs, so empty cells
+        # are searched instead only when there are fewer of them than signs
+        empty = self._board.count_empty()
+        if empty < len(self._optimal_cells) - empty:
+            return min(self._board.legal_moves(), key=self._rank.__getitem__)
+        for cell in self._optimal_cells:
             if self._board.get(*cell) is None:
-                self._board.turn(*cell)
-                return True
-        return False
+                return cell
+        return None
+
+    def cancel(self) -> None:
+        '''
+        Asks running `get_move` to stop as soon as possible.
+        '''
+
+    def turn(self) -> bool | None:
+        '''
+        Makes bot turn if it is bot's turn.
+
+        :return: True if turn was made, False if there are no empty cells.
+        :return: None if it is not bot's turn.
+        '''
+        if self._board.get_turn() != self._sign:
+            return None
+        if (cell := self.get_move()) is None:
+            return False
+        self._board.turn(*cell)
+        return True
@@ -0,0 +1,25 @@
+from board import Board
+from bot import Bot
+from learnedbot import LearnedBot
+from mctsbot import MCTSBot
+from searchbot import SearchBot
+
+# bot strategies by difficulty name
+DIFFICULTIES = {
+    'Easy': Bot,
+    'Hard': SearchBot,
+    'MCTS': MCTSBot,
+    'Learned': LearnedBot,
+}
+
+
+def make_bot(difficulty: str, sign: str, board: Board) -> Bot:
+    '''
+    Creates bot for difficulty.
+
+    :param difficulty: key of `DIFFICULTIES`.
+    :param sign: sign ('X' or 'O') for bot
+    :param board: board to play TicTacToe.
+    :return: bot instance.
+    '''
+    return DIFFICULTIES[difficulty](sign, board)
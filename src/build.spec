@@ -5,7 +5,7 @@ a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    datas=[('books', 'books'), ('weights', 'weights')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
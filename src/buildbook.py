@@ -0,0 +1,239 @@
+'''
+Builds perfect play opening books for `book.OpeningBook`.
+
+Usage:
+    python buildbook.py                 # 3x3 and 4x4 books
+    python buildbook.py 4 4 4 --plies 6
+'''
+import argparse
+import os
+import time
+from book import BOOKS_DIR, write_book
+from lines import cell_segments
+from symmetry import canonical, transforms, weights
+
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+
+class Solver:
+    '''
+    Exact alpha-beta solver over canonical positions.
+
+    :param rows: cells along the first board index.
+    :param cols: cells along the second board index.
+    :param k: signs in a row to win.
+    '''
+
+    def __init__(self, rows: int, cols: int, k: int) -> None:
+        self._rows, self._cols, self._k = rows, cols, k
+        self._through = [
+            cell_segments(rows, cols, k)[i][j]
+            for i in range(rows)
+            for j in range(cols)
+        ]
+        segments_count = 1 + max(line for cell in self._through for line in cell)
+        self._counts = {1: [0] * segments_count, 2: [0] * segments_count}
+        # cells with more segments through them are tried first
+        self._order = sorted(range(rows * cols), key=lambda index: -len(self._through[index]))
+        self._weights = weights(rows, cols)
+        self._keys = [0] * len(self._weights)
+        self._table = {}
+        self.nodes = 0
+
+    def _place(self, codes: list[int], index: int, code: int) -> bool:
+        codes[index] = code
+        keys = self._keys
+        for transform, weight in enumerate(self._weights):
+            keys[transform] += weight[index] * code
+        counts = self._counts[code]
+        won = False
+        for line in self._through[index]:
+            counts[line] += 1
+            won = won or counts[line] == self._k
+        return won
+
+    def _remove(self, codes: list[int], index: int, code: int) -> None:
+        counts = self._counts[code]
+        for line in self._through[index]:
+            counts[line] -= 1
+        keys = self._keys
+        for transform, weight in enumerate(self._weights):
+            keys[transform] -= weight[index] * code
+        codes[index] = 0
+
+    def setup(self, codes: list[int]) -> None:
+        '''
+        Resets segment counters and keys for position.
+        '''
+        for counts in self._counts.values():
+            counts[:] = [0] * len(counts)
+        self._keys = [0] * len(self._weights)
+        for index, code in enumerate(codes):
+            if code:
+                self._place(codes, index, code)
+
+    def solve(self, codes: list[int], code: int, empty: int) -> tuple[int, int]:
+        '''
+        Returns exact value and best move of position.
+
+        :param codes: flat cell codes, 1 for X and 2 for O.
+        :param code: code of side to move.
+        :param empty: count of empty cells.
+        :return: (value for side to move, best move index)
+        '''
+        self.setup(codes)
+        limit = self._rows * self._cols + 1
+        alpha, best_move = -limit, None
+        for index in self._order:
+            if codes[index]:
+                continue
+            if self._place(codes, index, code):
+                value = empty
+            elif empty == 1:
+                value = 0
+            else:
+                value = -self.search(codes, 3 - code, empty - 1, -limit, -alpha)
+            self._remove(codes, index, code)
+            if value > alpha:
+                alpha, best_move = value, index
+        return alpha, best_move
+
+    def search(self, codes: list[int], code: int, empty: int, alpha: int, beta: int) -> int:
+        '''
+        Returns exact value inside (alpha, beta) window.
+        Win is `1 + empty cells left`, so faster wins are better.
+
+        :param codes: flat cell codes, 1 for X and 2 for O.
+        :param code: code of side to move.
+        :param empty: count of empty cells.
+        :return: value for side to move
+        '''
+        self.nodes += 1
+        key = min(self._keys)
+        alpha_orig = alpha
+        if (entry := self._table.get(key)) is not None:
+            flag, value = entry
+            if flag == EXACT:
+                return value
+            if flag == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+
+        best_value = -self._rows * self._cols - 2
+        for index in self._order:
+            if codes[index]:
+                continue
+            if self._place(codes, index, code):
+                value = empty
+            elif empty == 1:
+                value = 0
+            else:
+                value = -self.search(codes, 3 - code, empty - 1, -beta, -alpha)
+            self._remove(codes, index, code)
+            best_value = max(best_value, value)
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        if best_value <= alpha_orig:
+            flag = UPPER
+        elif best_value >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self._table[key] = (flag, best_value)
+        return best_value
+
+
+def positions(rows: int, cols: int, k: int, plies: int):
+    '''
+    Yields canonical non-terminal positions with up to `plies` signs.
+
+    :return: generator of (key, flat codes, code to move, empty cells)
+    '''
+    through = [
+        cell_segments(rows, cols, k)[i][j]
+        for i in range(rows)
+        for j in range(cols)
+    ]
+    segment_cells = {}
+    for index, lines in enumerate(through):
+        for line in lines:
+            segment_cells.setdefault(line, []).append(index)
+
+    def won(codes: list[int], index: int) -> bool:
+        return any(
+            all(codes[cell] == codes[index] for cell in segment_cells[line])
+            for line in through[index]
+        )
+
+    layer = {0: [0] * (rows * cols)}
+    for ply in range(plies + 1):
+        code = 1 if ply % 2 == 0 else 2
+        next_layer = {}
+        for key, codes in layer.items():
+            yield key, codes, code, rows * cols - ply
+            if ply == plies:
+                continue
+            for index in range(rows * cols):
+                if codes[index]:
+                    continue
+                child = codes[:]
+                child[index] = code
+                if won(child, index) or ply + 1 == rows * cols:
+                    continue
+                child_key, transform = canonical(child, rows, cols)
+                if child_key not in next_layer:
+                    perm = transforms(rows, cols)[transform]
+                    next_layer[child_key] = [child[source] for source in perm]
+        layer = next_layer
+
+
+def build(rows: int, cols: int, k: int, plies: int, path: str) -> int:
+    '''
+    Solves positions and writes opening book.
+
+    :return: count of positions in book.
+    '''
+    solver = Solver(rows, cols, k)
+    entries = {}
+    for key, codes, code, empty in positions(rows, cols, k, plies):
+        value, move = solver.solve(codes, code, empty)
+        entries[key] = (move, value)
+    write_book(path, rows, cols, k, entries)
+    return len(entries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Builds opening books.')
+    parser.add_argument('rows', type=int, nargs='?')
+    parser.add_argument('cols', type=int, nargs='?')
+    parser.add_argument('k', type=int, nargs='?')
+    parser.add_argument('--plies', type=int, default=None, help='maximum signs on board in book positions')
+    parser.add_argument('--output', default=BOOKS_DIR, help='directory for books')
+    args = parser.parse_args()
+
+    if args.rows is None:
+        books = [(3, 3, 3, 9), (4, 4, 4, 4)]
+    else:
+        cols = args.cols or args.rows
+        k = args.k or min(args.rows, cols)
+        books = [(args.rows, cols, k, args.plies if args.plies is not None else args.rows * cols)]
+
+    os.makedirs(args.output, exist_ok=True)
+    for rows, cols, k, plies in books:
+        if args.plies is not None:
+            plies = args.plies
+        path = os.path.join(args.output, f'{rows}x{cols}x{k}.book')
+        start = time.perf_counter()
+        count = build(rows, cols, k, plies, path)
+        print(f'{path}: {count} positions in {time.perf_counter() - start:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
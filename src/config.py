@@ -1,23 +1,48 @@
-import pygame_menu
-
+import os
+from functools import cache
 
 MENU_WINDOW_SIZE = (240, 360)
-GAME_WINDOW_SIZE = (240, 240)
+# extra 20 px under the board are used for status line
+GAME_WINDOW_SIZE = (240, 260)
 CELLS = 3
+WIN_LENGTH = 3
 FPS = 10
+DIFFICULTY = 'Easy'
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 8765
+# per-user directory of game data files
+DATA_DIR = os.path.join(
+    os.environ.get('APPDATA') or os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share'),
+    'tictactoe',
+)
+# finished games are appended here, None to disable
+MOVE_LOG = os.path.join(DATA_DIR, 'games.log')
+# persistent results of all games, None to keep score only until exit
+STATS_DB = os.path.join(DATA_DIR, 'stats.sqlite3')
+# timing of hot paths, F3 shows it in game, also enabled by TICTACTOE_PROFILE=1
+PROFILE = False
+PROFILE_FILE = os.path.join(DATA_DIR, 'profile.jsonl')
 
-menu_theme = pygame_menu.Theme(
-    background_color=(40, 41, 35),
-    cursor_color=(255, 255, 255),
-    cursor_selection_color=(80, 80, 80, 120),
-    scrollbar_color=(39, 41, 42),
-    scrollbar_slider_color=(65, 66, 67),
-    scrollbar_slider_hover_color=(90, 89, 88),
-    selection_color=(255, 255, 255),
-    title_background_color=(47, 48, 51),
-    title_font_color=(215, 215, 215),
-    widget_font_color=(200, 200, 200),
 
-    title=False,
-    widget_font_size=20,
-)
+@cache
+def get_menu_theme():
+    '''
+    Builds menu theme on the first call, so pygame_menu is imported only by menus.
+    '''
+    import pygame_menu
+
+    return pygame_menu.Theme(
+        background_color=(40, 41, 35),
+        cursor_color=(255, 255, 255),
+        cursor_selection_color=(80, 80, 80, 120),
+        scrollbar_color=(39, 41, 42),
+        scrollbar_slider_color=(65, 66, 67),
+        scrollbar_slider_hover_color=(90, 89, 88),
+        selection_color=(255, 255, 255),
+        title_background_color=(47, 48, 51),
+        title_font_color=(215, 215, 215),
+        widget_font_color=(200, 200, 200),
+
+        title=False,
+        widget_font_size=20,
+    )
@@ -1,7 +1,12 @@
+import sys
 from enum import Enum
+from functools import lru_cache
 import pygame
 
+import profiler
+import stats
 from board import Board
+from replay import MoveLogWriter
 
 Colorable = \
     pygame.Color | \
@@ -11,14 +16,72 @@ Colorable = \
     tuple[int, int, int, int]
 
 
+@lru_cache(maxsize=16)
+def get_font(
+    name: str,
+    size: int,
+    bold: bool = False,
+    italic: bool = False,
+    underline: bool = False,
+    strikethrough: bool = False,
+) -> pygame.font.Font:
+    '''
+    Returns cached system font with style.
+
+    :param name: font name
+    :param size: font size
+    :param bold: whether the font should be rendered in bold
+    :param italic: whether the font should be rendered in italic
+    :param underline: whether the font should be underlined
+    :param strikethrough: whether the font should be strikethrough
+    :return: pygame.font.Font
+    '''
+    font = pygame.font.SysFont(name, size)
+    font.set_bold(bold)
+    font.set_italic(italic)
+    font.set_underline(underline)
+    font.set_strikethrough(strikethrough)
+    return font
+
+
+@lru_cache(maxsize=128)
+def _render(
+    text: str,
+    font: pygame.font.Font,
+    antialias: bool,
+    color: tuple[int, int, int, int],
+    background: tuple[int, int, int, int] | None,
+) -> pygame.surface.Surface:
+    '''
+    Returns cached rendered text.
+    Surfaces are shared between callers, so they must not be modified.
+    '''
+    return font.render(text, antialias, color, background)
+
+
+def _color_key(color: Colorable | None) -> tuple[int, int, int, int] | None:
+    '''
+    Converts color to hashable RGBA tuple.
+    '''
+    if color is None:
+        return None
+    return tuple(pygame.Color(color))
+
+
 class Game:
     '''
     Basic TicTacToe game class.
 
     :pararm width: desired width of the game window.
     :pararm height: desired height of the game window.
-    :param cells: desired cells in one row / column.
+    :param cells: desired cells in one row / column or (rows, columns).
+    :param fps: wakeups per second while no events come.
+    :param win_length: signs in a row to win, equals to smaller side by default.
+    :param move_log: file to append finished games to, see `replay.py`.
     '''
+    # game mode name in statistics
+    MODE = 'game'
+
     class State(Enum):
         '''
         Game states.
@@ -34,31 +97,182 @@ class Game:
         self,
         width: int = 0,
         height: int = 0,
-        cells: int = 3,
+        cells: int | tuple[int, int] = 3,
         fps: int = 10,
+        win_length: int | None = None,
+        move_log: str | None = None,
     ) -> None:
-        self._board_size = 3
+        if isinstance(cells, int):
+            cells = (cells, cells)
+        # hot paths are wrapped only when profiling is enabled
+        self._profiler = profiler.active
+        self._debug = False
+        self._debug_rect = None
+        if self._profiler is not None:
+            self.draw = self._profiler.timed('draw', self.draw)
+            self.handle_event = self._profiler.timed('event', self.handle_event)
+            self.check_win_tie = self._profiler.timed('check', self.check_win_tie)
+        self._board_shape = tuple(cells)
+        self._win_length = win_length
         self._width = width
         self._height = height
         self._fps = fps
+        self._move_log = move_log
+        self._log = None
 
-        self._clock = pygame.time.Clock()
-        self._board = Board(self._board_size)
+        self._board = self.new_board()
         self._state = Game.State.Init
-        self._score = {'X': 0, 'O': 0, 'Tie': 0}
+        self._stats = stats.active
+        if self._stats is not None:
+            self._score = self._stats.score(self.stats_key())
+        else:
+            self._score = {'X': 0, 'O': 0, 'Tie': 0}
+        # what is on the screen now
+        self._background = None
+        # cell size and sign sprites by (sign, color), valid until window resize
+        self._cell_dim = None
+        self._sprites = {}
+        self._drawn_state = None
+        self._drawn_cells = []
+        self._drawn_board = None
+        self._drawn_empty = 0
+        self._redraw = True
+        # (score items, rendered score panel)
+        self._score_panel = (None, None)
 
     def play_again(self) -> None:
         '''
         Resets board and self._state.
         '''
-        self._board = Board(self._board_size)
+        self._board = self.new_board()
         self._state = Game.State.Running
+        self.on_turn()
+
+    def new_board(self) -> Board:
+        '''
+        Creates empty board for the game.
+        '''
+        return Board(*self._board_shape, self._win_length)
 
     def run(self) -> None:
         '''
         Game mainloop.
+        Sleeps until next event, so idle game almost does not use CPU.
         '''
         self._surface = pygame.display.set_mode((self._width, self._height))
+        self.on_resize()
+        if self._move_log is not None:
+            self._log = MoveLogWriter(self._move_log)
+
+        try:
+            self.start()
+            while True:
+                self.draw()
+                if self._profiler is not None:
+                    self._profiler.frame()
+                event = pygame.event.wait(1000 // self._fps)
+                if event.type == pygame.NOEVENT:
+                    continue
+                if not self.handle_event(event):
+                    self.on_exit()
+                    return
+        finally:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            if self._profiler is not None:
+                self._profiler.write()
+
+    def start(self) -> None:
+        '''
+        Starts the first game.
+        '''
+        self._state = Game.State.Running
+        self.on_turn()
+
+    def handle_event(self, event: pygame.event.Event) -> bool:
+        '''
+        Handles one event of the mainloop.
+
+        :param event: pygame event
+        :return: False to leave the game, else True
+        '''
+        # close button
+        if event.type == pygame.QUIT:
+            self.on_exit()
+            sys.exit(0)
+        # Escape key
+        if (event.type == pygame.KEYDOWN) and (event.key == pygame.K_ESCAPE):
+            return False
+        # window content lost
+        if event.type == pygame.VIDEOEXPOSE:
+            self.request_redraw()
+        if event.type == pygame.VIDEORESIZE:
+            self.on_resize()
+        # debug overlay
+        if (event.type == pygame.KEYDOWN) and (event.key == pygame.K_F3) and (self._profiler is not None):
+            self._debug = not self._debug
+            self.request_redraw()
+        # is game running ?
+        if self._state == Game.State.Running:
+            # left click
+            if (event.type == pygame.MOUSEBUTTONUP) \
+                    and (event.button == 1) \
+                    and self.can_click() \
+                    and (cell := self.get_cell(event.pos)) is not None:
+                self.make_turn(cell)
+        elif self._state == Game.State.Finished:
+            if (event.type == pygame.KEYDOWN) and (event.key == pygame.K_SPACE):
+                self.play_again()
+        return True
+
+    def can_click(self) -> bool:
+        '''
+        Checks if current turn is made by mouse click.
+        '''
+        return True
+
+    def make_turn(self, cell: tuple[int, int]) -> None:
+        '''
+        Makes turn on the board and checks game result.
+
+        :param cell: (i, j) cell to place sign
+        '''
+        self._board.turn(*cell)
+        self.after_turn()
+
+    def after_turn(self) -> None:
+        '''
+        Checks game result after turn was made.
+        '''
+        if (winner := self.check_win_tie()):
+            self._score[winner] += 1
+            self._state = Game.State.Finished
+            if self._log is not None:
+                self._log.write(self._board)
+            if self._stats is not None:
+                self._stats.record(self.stats_key(), winner, len(self._board.get_moves()))
+            if self._profiler is not None:
+                self._profiler.game_finished(len(self._board.get_moves()))
+        else:
+            self.on_turn()
+
+    def stats_key(self) -> stats.Key:
+        '''
+        Returns parameters games are grouped by in statistics.
+        '''
+        rows, cols = self._board.get_shape()
+        return (self.MODE, '', '', rows, cols, self._board.get_k())
+
+    def on_turn(self) -> None:
+        '''
+        Called when game is waiting for the next turn.
+        '''
+
+    def on_exit(self) -> None:
+        '''
+        Called when player leaves the game.
+        '''
 
     def check_win_tie(self) -> str | None:
         '''
@@ -69,13 +283,7 @@ class Game:
         :return: "Tie" if game is tie.
         :return: None in other cases.
         '''
-        if self._board.is_winner('X'):
-            return 'X'
-        elif self._board.is_winner('O'):
-            return 'O'
-        elif self._board.is_tie():
-            return 'Tie'
-        return None
+        return self._board.result()
 
     '''
     Drawing functions
@@ -84,17 +292,49 @@ class Game:
     def draw(self) -> None:
         '''
         Renders the game mainloop.
+        While game is running only changed cells are redrawn
+        and frame is skipped if nothing changed.
+        '''
+        if self._redraw \
+                or (self._state != self._drawn_state) \
+                or (self._board is not self._drawn_board):
+            self._surface.fill((0, 0, 0))
+            match self._state:
+                case Game.State.Init:
+                    self.draw_init()
+                case Game.State.Running:
+                    self.draw_board()
+                    self.draw_status(True)
+                case Game.State.Finished:
+                    self.draw_gameover()
+            if self._debug:
+                self.draw_debug()
+            pygame.display.flip()
+        else:
+            rects = []
+            if self._state == Game.State.Running:
+                rects = self.draw_changed_cells() + self.draw_status(False)
+            if self._debug:
+                rects.append(self.draw_debug())
+            if rects:
+                pygame.display.update(rects)
+        self._drawn_state = self._state
+        self._redraw = False
 
-        :param surface: pygame Surface to draw
+    def request_redraw(self) -> None:
+        '''
+        Makes next `draw` call redraw the whole screen.
         '''
-        self._surface.fill((0, 0, 0))
-        match self._state:
-            case Game.State.Running:
-                self.draw_board()
-            case Game.State.Finished:
-                self.draw_gameover()
+        self._redraw = True
 
-        pygame.display.flip()
+    def on_resize(self) -> None:
+        '''
+        Drops cell size, background and sprites of previous window size.
+        '''
+        self._cell_dim = None
+        self._sprites.clear()
+        self._background = None
+        self.request_redraw()
 
     def draw_board(
         self,
@@ -109,38 +349,172 @@ class Game:
         :param X_color: color for sign "X"
         :param O_color: color for sign "O"
         '''
-        self.draw_grid(grid_color)
-        for i in range(self._board_size):
-            for j in range(self._board_size):
-                match self._board.get(i, j):
-                    case 'X':
-                        self.draw_X((i, j), X_color)
-                    case 'O':
-                        self.draw_O((i, j), O_color)
+        if self._background is None:
+            self._background = pygame.Surface(self._surface.get_size())
+            self.draw_grid(grid_color, self._background)
+        self._surface.blit(self._background, (0, 0))
+        cols = self._board_shape[1]
+        cell_dim = self.get_cell_dimension()
+        sprites = {'X': self.get_sprite('X', X_color), 'O': self.get_sprite('O', O_color)}
+        self._surface.blits(
+            [
+                (sprites[sign], (cell_dim * (index // cols), cell_dim * (index % cols)))
+                for index, sign in enumerate(self._board)
+                if sign is not None
+            ],
+            doreturn=False,
+        )
+        self._drawn_cells = list(self._board)
+        self._drawn_board = self._board
+        self._drawn_empty = self._board.count_empty()
+
+    def draw_changed_cells(
+        self,
+        X_color: Colorable = "red",
+        O_color: Colorable = "green"
+    ) -> list[pygame.Rect]:
+        '''
+        Redraws cells changed since last drawing.
+
+        :param X_color: color for sign "X"
+        :param O_color: color for sign "O"
+        :return: list of updated screen rects
+        '''
+        if self._drawn_empty == self._board.count_empty():
+            return []
+        cols = self._board_shape[1]
+        cell_dim = self.get_cell_dimension()
+        rects = []
+        for index, sign in enumerate(self._board):
+            if sign == self._drawn_cells[index]:
+                continue
+            i, j = divmod(index, cols)
+            rect = pygame.Rect(cell_dim * i, cell_dim * j, cell_dim, cell_dim)
+            self._surface.blit(self._background, rect, rect)
+            self.draw_sign((i, j), sign, X_color, O_color)
+            self._drawn_cells[index] = sign
+            rects.append(rect)
+        self._drawn_empty = self._board.count_empty()
+        return rects
+
+    def draw_status(self, full: bool) -> list[pygame.Rect]:
+        '''
+        Draws status line under the board if window has space for it.
+
+        :param full: True if whole screen is redrawn
+        :return: list of updated screen rects
+        '''
+        return []
+
+    def draw_debug(self) -> pygame.Rect:
+        '''
+        Draws profiler statistics over the top of the screen.
+        Text changes every frame, so it is not cached.
+
+        :return: updated screen rect
+        '''
+        font = get_font("Consolas", 12)
+        lines = [font.render(line, True, "yellow") for line in self._profiler.lines()]
+        height = sum(line.get_height() for line in lines)
+        rect = pygame.Rect(0, 0, self._surface.get_width(), height)
+        if (self._debug_rect is not None) and (rect.height < self._debug_rect.height):
+            # shorter overlay leaves old lines on the screen
+            self.request_redraw()
+        self._debug_rect = rect
+        self._surface.fill((0, 0, 0), rect)
+        top = 0
+        for line in lines:
+            self._surface.blit(line, (2, top))
+            top += line.get_height()
+        return rect
+
+    def draw_sign(
+        self,
+        cell: tuple[int, int],
+        sign: str | None,
+        X_color: Colorable = "red",
+        O_color: Colorable = "green"
+    ) -> None:
+        '''
+        Draws sign in cell.
+
+        :param cell: (column, row) to draw sign
+        :param sign: "X", "O" or None
+        :param X_color: color for sign "X"
+        :param O_color: color for sign "O"
+        '''
+        match sign:
+            case 'X':
+                self.draw_X(cell, X_color)
+            case 'O':
+                self.draw_O(cell, O_color)
 
     def draw_grid(
         self,
         color: Colorable,
+        surface: pygame.surface.Surface | None = None,
     ) -> None:
         '''
         Draws grid.
 
         :param color: color for grid
+        :param surface: surface to draw, game surface by default
         '''
+        if surface is None:
+            surface = self._surface
         cell_dim = self.get_cell_dimension()
+        rows, cols = self._board_shape
         # draws vertical lines
-        for i in range(1, self._board_size):
+        for i in range(1, rows):
             pygame.draw.line(
-                self._surface, color,
-                (cell_dim * i, 0), (cell_dim * i, cell_dim * self._board_size)
+                surface, color,
+                (cell_dim * i, 0), (cell_dim * i, cell_dim * cols)
             )
         # draws horizontal lines
-        for i in range(1, self._board_size):
+        for i in range(1, cols):
             pygame.draw.line(
-                self._surface, color,
-                (0, cell_dim * i), (cell_dim * self._board_size, cell_dim * i)
+                surface, color,
+                (0, cell_dim * i), (cell_dim * rows, cell_dim * i)
             )
 
+    def get_sprite(self, sign: str, color: Colorable) -> pygame.surface.Surface:
+        '''
+        Returns sign drawn on transparent surface of cell size.
+        Sprite is drawn once per sign and color until window is resized.
+
+        :param sign: "X" or "O"
+        :param color: color to draw symbol
+        '''
+        key = (sign, _color_key(color))
+        if (sprite := self._sprites.get(key)) is None:
+            cell_dim = self.get_cell_dimension()
+            sprite = pygame.Surface((cell_dim, cell_dim)).convert()
+            # run-length encoded transparent pixels are skipped by blit
+            transparent = (0, 0, 0) if key[1][:3] != (0, 0, 0) else (255, 255, 255)
+            sprite.fill(transparent)
+            sprite.set_colorkey(transparent, pygame.RLEACCEL)
+            center = cell_dim // 2
+            if sign == 'X':
+                length = cell_dim // 2 * .8
+                pygame.draw.line(
+                    sprite, color,
+                    (center - length, center - length),
+                    (center + length, center + length),
+                )
+                pygame.draw.line(
+                    sprite, color,
+                    (center + length, center - length),
+                    (center - length, center + length),
+                )
+            else:
+                radius = cell_dim // 2 * .85
+                pygame.draw.circle(
+                    sprite, color,
+                    (center, center), radius=radius, width=1
+                )
+            self._sprites[key] = sprite
+        return sprite
+
     def draw_X(
         self,
         cell: tuple[int, int],
@@ -154,19 +528,7 @@ class Game:
         '''
         i, j = cell
         cell_dim = self.get_cell_dimension()
-        x = cell_dim * i + cell_dim // 2
-        y = cell_dim * j + cell_dim // 2
-        length = cell_dim // 2 * .8
-        pygame.draw.line(
-            self._surface, color,
-            (x - length, y - length),
-            (x + length, y + length),
-        )
-        pygame.draw.line(
-            self._surface, color,
-            (x + length, y - length),
-            (x - length, y + length),
-        )
+        self._surface.blit(self.get_sprite('X', color), (cell_dim * i, cell_dim * j))
 
     def draw_O(
         self,
@@ -181,13 +543,12 @@ class Game:
         '''
         i, j = cell
         cell_dim = self.get_cell_dimension()
-        x = cell_dim * i + cell_dim // 2
-        y = cell_dim * j + cell_dim // 2
-        radius = cell_dim // 2 * .85
-        pygame.draw.circle(
-            self._surface, color,
-            (x, y), radius=radius, width=1
-        )
+        self._surface.blit(self.get_sprite('O', color), (cell_dim * i, cell_dim * j))
+
+    def draw_init(self) -> None:
+        '''
+        Draws screen before the game started.
+        '''
 
     def draw_gameover(self) -> None:
         '''
@@ -200,27 +561,43 @@ class Game:
         '''
         Draws score on screen.
         '''
+        panel = self.render_score()
+        # calculating coordinates to place rendered Scores
+        screen_width, screen_height = self._surface.get_size()
+        width, height = panel.get_size()
+        self._surface.blit(panel, ((screen_width - width) // 2, (screen_height - height) // 2))
+
+    def render_score(self) -> pygame.surface.Surface:
+        '''
+        Renders score panel.
+        Panel is rendered again only if score changed.
+
+        :return: pygame.surface.Surface with all score lines
+        '''
+        key = tuple(self._score.items())
+        if self._score_panel[0] == key:
+            return self._score_panel[1]
         scores = []
         scores.append(self.render_text(
             "Score:",
             "Times New Roman",
             30,
         ))
-        for key, val in self._score.items():
+        for name, val in self._score.items():
             scores.append(self.render_text(
-                f"{key:<3}: {val:>7}",
+                f"{name:<3}: {val:>7}",
                 "Times New Roman",
                 20,
             ))
-        # calculating coordinates to place rendered Scores
-        screen_width, screen_height = self._surface.get_size()
-        center_x, center_y = screen_width // 2, screen_height // 2
-        total_height = sum(surf.get_height() for surf in scores)
-        y = center_y - total_height // 2
+        width = max(surf.get_width() for surf in scores)
+        height = sum(surf.get_height() for surf in scores)
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        y = 0
         for surf in scores:
-            width, height = surf.get_size()
-            self._surface.blit(surf, (center_x - width // 2, y))
-            y += height
+            panel.blit(surf, ((width - surf.get_width()) // 2, y))
+            y += surf.get_height()
+        self._score_panel = (key, panel)
+        return panel
 
     def draw_hints(self) -> None:
         '''
@@ -261,6 +638,7 @@ class Game:
     ) -> pygame.surface.Surface:
         '''
         Creates text surface.
+        Fonts and rendered texts are cached, returned surface must not be modified.
 
         :param text: text to draw
         :param font_name: font name
@@ -274,12 +652,8 @@ class Game:
         :param strikethrough: whether the font should be strikethrough
         :return: pygame.surface.Surface rendered text
         '''
-        font = pygame.font.SysFont(font_name, font_size)
-        font.set_bold(bold)
-        font.set_italic(italic)
-        font.set_underline(underline)
-        font.set_strikethrough(strikethrough)
-        return font.render(text, antialias, color, background)
+        font = get_font(font_name, font_size, bold, italic, underline, strikethrough)
+        return _render(text, font, antialias, _color_key(color), _color_key(background))
 
     '''
     Util methods
@@ -291,4 +665,23 @@ class Game:
 
         :return: integer value that corresponds cell width / height
         '''
-        return min(self._surface.get_size()) // self._board_size
+        if self._cell_dim is None:
+            width, height = self._surface.get_size()
+            rows, cols = self._board_shape
+            self._cell_dim = min(width // rows, height // cols)
+        return self._cell_dim
+
+    def get_cell(self, pos: tuple[int, int]) -> tuple[int, int] | None:
+        '''
+        Returns board cell under screen position.
+
+        :param pos: (x, y) position on the screen
+        :return: (i, j) cell or None if position is outside the board
+        '''
+        x, y = pos
+        cell_dim = self.get_cell_dimension()
+        i, j = x // cell_dim, y // cell_dim
+        rows, cols = self._board_shape
+        if (0 <= i < rows) and (0 <= j < cols):
+            return i, j
+        return None
@@ -1,60 +1,124 @@
-import sys
+from concurrent.futures import Future, ThreadPoolExecutor
 import pygame
+import stats
+from board import Board
 from game import Game
-from bot import Bot
+from bots import make_bot
+
+BOT_TURN = pygame.event.custom_type()
 
 
 class GamePlayerBot(Game):
     '''
     Class for Player vs Bot TicTacToe mode.
+    Bot thinks in worker thread, so the window keeps responding.
 
     :param player_sign: sign ('X' or 'O') for player
+    :param cells: desired cells in one row / column or (rows, columns).
+    :param win_length: signs in a row to win.
+    :param difficulty: bot difficulty, key of `bots.DIFFICULTIES`.
+    :param move_log: file to append finished games to.
     '''
+    MODE = 'bot'
 
-    def __init__(self, width: int, height: int, fps: int, player_sign: str) -> None:
-        super().__init__(width, height, fps)
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        fps: int,
+        player_sign: str,
+        cells: int | tuple[int, int] = 3,
+        win_length: int | None = None,
+        difficulty: str = 'Easy',
+        move_log: str | None = None,
+    ) -> None:
         self._player_sign = player_sign
         self._bot_sign = 'X' if player_sign == 'O' else 'O'
-        self._bot = Bot(self._bot_sign, self._board)
+        self._difficulty = difficulty
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._thinking = None
+        self._drawn_status = None
+        super().__init__(width, height, cells, fps, win_length, move_log)
+
+    def new_board(self) -> Board:
+        '''
+        Creates empty board and bot playing on it.
+        '''
+        board = super().new_board()
+        self._bot = make_bot(self._difficulty, self._bot_sign, board)
+        if self._profiler is not None:
+            self._bot.get_move = self._profiler.timed('bot', self._bot.get_move)
+        return board
 
-    def play_again(self):
+    def play_again(self) -> None:
+        self.stop_thinking()
         super().play_again()
-        self._bot = Bot(self._bot_sign, self._board)
-
-    def run(self) -> None:
-        super().run()
-
-        self._state = Game.State.Running
-        while True:
-            while (event := pygame.event.poll()):
-                # close button
-                if event.type == pygame.QUIT:
-                    sys.exit(0)
-                # Escape key
-                if (event.type == pygame.KEYDOWN) and (event.key == pygame.K_ESCAPE):
-                    return 0
-                # is game running ?
-                if self._state == Game.State.Running:
-                    # left click
-                    if (event.type == pygame.MOUSEBUTTONUP)\
-                            and (event.button == 1)\
-                            and (self._board.get_turn() == self._player_sign):
-                        x, y = event.pos
-                        cell_dim = self.get_cell_dimension()
-                        i, j = x // cell_dim, y // cell_dim
-                        self._board.turn(i, j)
-                        if (winner := self.check_win_tie()):
-                            self._score[winner] += 1
-                            self._state = Game.State.Finished
-                elif self._state == Game.State.Finished:
-                    if (event.type == pygame.KEYDOWN) and (event.key == pygame.K_SPACE):
-                        self.play_again()
-
-            # bot move
-            if (self._state == Game.State.Running) and self._bot.turn():
-                if (winner := self.check_win_tie()):
-                    self._score[winner] += 1
-                    self._state = Game.State.Finished
-
-            self.draw()
-            self._clock.tick(self._fps)
+
+    def stats_key(self) -> stats.Key:
+        rows, cols = self._board.get_shape()
+        return (self.MODE, self._difficulty, self._player_sign, rows, cols, self._board.get_k())
+
+    def can_click(self) -> bool:
+        return self._board.get_turn() == self._player_sign
+
+    def on_turn(self) -> None:
+        '''
+        Starts bot thinking if it is bot's turn.
+        '''
+        if self._board.get_turn() == self._bot_sign:
+            self._thinking = self._executor.submit(self._bot.get_move)
+            self._thinking.add_done_callback(self._post_move)
+
+    def _post_move(self, future: Future) -> None:
+        '''
+        Passes finished bot move to the mainloop.
+        Runs in worker thread.
+        '''
+        if not future.cancelled():
+            pygame.event.post(pygame.event.Event(BOT_TURN, future=future))
+
+    def stop_thinking(self) -> None:
+        '''
+        Cancels bot search, its move will be ignored.
+        '''
+        if self._thinking is not None:
+            self._bot.cancel()
+            self._thinking.cancel()
+            self._thinking = None
+
+    def on_exit(self) -> None:
+        self.stop_thinking()
+        self._executor.shutdown(wait=False)
+        pygame.event.clear(BOT_TURN)
+
+    def handle_event(self, event: pygame.event.Event) -> bool:
+        if event.type == BOT_TURN:
+            if (event.future is self._thinking) and (self._state == Game.State.Running):
+                self._thinking = None
+                if self._profiler is not None:
+                    self._profiler.search = dict(getattr(self._bot, 'stats', {}))
+                if (cell := event.future.result()) is not None:
+                    self.make_turn(cell)
+            return True
+        return super().handle_event(event)
+
+    def draw_status(self, full: bool) -> list[pygame.Rect]:
+        '''
+        Draws "thinking" indicator under the board while bot thinks.
+        '''
+        text = ''
+        if self._thinking is not None:
+            text = 'Bot is thinking' + '.' * (pygame.time.get_ticks() // 300 % 4)
+        if not full and text == self._drawn_status:
+            return []
+        self._drawn_status = text
+        top = self.get_cell_dimension() * self._board_shape[1]
+        width, height = self._surface.get_size()
+        rect = pygame.Rect(0, top, width, height - top)
+        if rect.height <= 0:
+            return []
+        self._surface.fill((0, 0, 0), rect)
+        if text:
+            surf = self.render_text(text, "Times New Roman", 14)
+            self._surface.blit(surf, (rect.x + 4, rect.centery - surf.get_height() // 2))
+        return [rect]
@@ -0,0 +1,153 @@
+import socket
+import threading
+import pygame
+from game import Game
+
+NETWORK_MESSAGE = pygame.event.custom_type()
+
+
+class GamePlayerNetwork(Game):
+    '''
+    Player vs Player game through `server.GameServer`.
+    Server messages are read in background thread and posted as pygame events.
+
+    :param host: server host.
+    :param port: server port.
+    :param cells: desired cells in one row / column or (rows, columns).
+    :param win_length: signs in a row to win.
+    :param move_log: file to append finished games to.
+    '''
+    MODE = 'network'
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        fps: int,
+        host: str,
+        port: int,
+        cells: int | tuple[int, int] = 3,
+        win_length: int | None = None,
+        move_log: str | None = None,
+    ) -> None:
+        super().__init__(width, height, cells, fps, win_length, move_log)
+        self._address = (host, port)
+        self._socket = None
+        self._sign = None
+        self._status = ''
+
+    def start(self) -> None:
+        '''
+        Connects to server and joins matchmaking queue.
+        '''
+        self._state = Game.State.Init
+        try:
+            self._socket = socket.create_connection(self._address, timeout=5)
+            self._socket.settimeout(None)
+        except OSError:
+            self.set_status(f'Cannot connect to {self._address[0]}:{self._address[1]}')
+            return
+        threading.Thread(target=self._read, args=(self._socket,), daemon=True).start()
+        self.join()
+
+    def join(self) -> None:
+        '''
+        Asks server for opponent.
+        '''
+        rows, cols = self._board_shape
+        self._state = Game.State.Init
+        self.set_status('Waiting for opponent...')
+        self.send('JOIN', rows, cols, self._board.get_k())
+
+    def send(self, *words) -> None:
+        '''
+        Sends one message line to server.
+        '''
+        if self._socket is None:
+            return
+        try:
+            self._socket.sendall(' '.join(map(str, words)).encode() + b'\n')
+        except OSError:
+            self.set_status('Connection lost')
+
+    def set_status(self, status: str) -> None:
+        '''
+        Sets text shown before the game starts.
+        '''
+        self._status = status
+        self.request_redraw()
+
+    def _read(self, sock: socket.socket) -> None:
+        '''
+        Posts server messages to pygame event queue.
+        Runs in background thread.
+        '''
+        try:
+            for line in sock.makefile('rb'):
+                pygame.event.post(pygame.event.Event(NETWORK_MESSAGE, words=line.decode().split()))
+            pygame.event.post(pygame.event.Event(NETWORK_MESSAGE, words=['CLOSED']))
+        except (OSError, pygame.error):
+            # game left or pygame is not running anymore
+            pass
+
+    def handle_event(self, event: pygame.event.Event) -> bool:
+        if event.type == NETWORK_MESSAGE:
+            self.handle_message(event.words)
+            return True
+        return super().handle_event(event)
+
+    def handle_message(self, words: list[str]) -> None:
+        '''
+        Handles one message from server.
+        '''
+        match words:
+            case ['START', sign, rows, cols, k]:
+                self._sign = sign
+                self._board_shape = (int(rows), int(cols))
+                self._win_length = int(k)
+                self._board = self.new_board()
+                if self._stats is not None:
+                    self._score = self._stats.score(self.stats_key())
+                self._state = Game.State.Running
+            case ['MOVE', i, j]:
+                self._board.turn(int(i), int(j))
+                self.after_turn()
+            case ['LEFT']:
+                self.join()
+            case ['CLOSED']:
+                self._socket = None
+                if self._state != Game.State.Finished:
+                    self._state = Game.State.Init
+                    self.set_status('Connection lost')
+
+    def can_click(self) -> bool:
+        return self._board.get_turn() == self._sign
+
+    def make_turn(self, cell: tuple[int, int]) -> None:
+        '''
+        Sends turn to server, board is updated when server accepts it.
+        '''
+        if self._board.get(*cell) is None:
+            self.send('MOVE', *cell)
+
+    def play_again(self) -> None:
+        self.join()
+
+    def on_exit(self) -> None:
+        pygame.event.clear(NETWORK_MESSAGE)
+        if self._socket is not None:
+            self.send('QUIT')
+            self._socket.close()
+            self._socket = None
+
+    def draw_init(self) -> None:
+        '''
+        Draws connection status.
+        '''
+        status = self.render_text(self._status, "Times New Roman", 20)
+        hint = self.render_text("Press Esc to go to Menu.", "Times New Roman", 18)
+        screen_width, screen_height = self._surface.get_size()
+        width, height = status.get_size()
+        self._surface.blit(status, ((screen_width - width) // 2, (screen_height - height) // 2))
+        width, height = hint.get_size()
+        self._surface.blit(hint, ((screen_width - width) // 2, screen_height - height))
@@ -0,0 +1,47 @@
+from board import Board
+from bot import Bot
+from lines import nearby_only
+from patterns import PatternWeights, cell_powers, gain, segment_codes
+
+
+class LearnedBot(Bot):
+    '''
+    Bot which chooses turns by pattern weights learned with `train.py`.
+    Plays as `Bot` on boards without trained weights.
+
+    :param sign: sign ('X' or 'O') for bot
+    :param board: board to play TicTacToe.
+    '''
+
+    def __init__(self, sign: str, board: Board) -> None:
+        super().__init__(sign, board)
+        self.stats = {'gain': 0.0}
+
+    def generate_checks(self) -> None:
+        super().generate_checks()
+        rows, cols = self._board.get_shape()
+        k = self._board.get_k()
+        self._cols = cols
+        self._weights = PatternWeights.load(rows, cols, k)
+        self._powers = cell_powers(rows, cols, k)
+        self._nearby_only = nearby_only(rows, cols)
+
+    def get_move(self) -> tuple[int, int] | None:
+        '''
+        Chooses cell with the best value change for bot.
+
+        :return: (i, j) cell or None if there are no empty cells.
+        '''
+        if self._weights is None or self._board.count_empty() == 0:
+            return super().get_move()
+        if (cell := self.get_forced_move()) is not None:
+            return cell
+        table, powers, cols = self._weights.table, self._powers, self._cols
+        codes = segment_codes(self._board, self._sign)
+        best, best_gain = None, None
+        for i, j in self._board.legal_moves(nearby=self._nearby_only):
+            value = gain(table, codes, powers[i * cols + j])
+            if best_gain is None or value > best_gain:
+                best, best_gain = (i, j), value
+        self.stats['gain'] = best_gain
+        return best
@@ -0,0 +1,77 @@
+from functools import cache
+
+# (di, dj) steps: along column, along row, main and anti diagonal
+DIRECTIONS = ((1, 0), (0, 1), (1, 1), (1, -1))
+
+
+@cache
+def segments(rows: int, cols: int, k: int) -> tuple[tuple[tuple[int, int], ...], ...]:
+    '''
+    Returns every winning segment of `k` cells on `rows` x `cols` board.
+
+    :param rows: cells along the first board index.
+    :param cols: cells along the second board index.
+    :param k: cells in a row required to win.
+    :return: tuple of segments, each segment is a tuple of (i, j) cells.
+    '''
+    result = []
+    for di, dj in DIRECTIONS:
+        for i in range(rows):
+            for j in range(cols):
+                end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                if 0 <= end_i < rows and 0 <= end_j < cols:
+                    result.append(tuple((i + di * n, j + dj * n) for n in range(k)))
+    return tuple(result)
+
+
+@cache
+def cell_segments(rows: int, cols: int, k: int) -> tuple[tuple[tuple[int, ...], ...], ...]:
+    '''
+    Returns index from every cell to the segments passing through it.
+
+    :param rows: cells along the first board index.
+    :param cols: cells along the second board index.
+    :param k: cells in a row required to win.
+    :return: `index[i][j]` is a tuple of segment numbers in `segments()`.
+    '''
+    index = [[[] for _ in range(cols)] for _ in range(rows)]
+    for number, segment in enumerate(segments(rows, cols, k)):
+        for i, j in segment:
+            index[i][j].append(number)
+    return tuple(tuple(tuple(cell) for cell in row) for row in index)
+
+
+# boards with more cells try only cells near signs as turns
+NEARBY_ONLY_CELLS = 25
+
+
+def nearby_only(rows: int, cols: int) -> bool:
+    '''
+    Checks if bots and training try only cells near signs as turns,
+    see `Board.legal_moves(nearby=True)`.
+
+    :param rows: cells along the first board index.
+    :param cols: cells along the second board index.
+    '''
+    return rows * cols > NEARBY_ONLY_CELLS
+
+
+@cache
+def neighbours(rows: int, cols: int) -> tuple[tuple[int, ...], ...]:
+    '''
+    Returns flat indexes of cells around every cell.
+
+    :param rows: cells along the first board index.
+    :param cols: cells along the second board index.
+    :return: `neighbours[i * cols + j]` is a tuple of up to 8 cell indexes.
+    '''
+    return tuple(
+        tuple(
+            ni * cols + nj
+            for ni in range(max(i - 1, 0), min(i + 2, rows))
+            for nj in range(max(j - 1, 0), min(j + 2, cols))
+            if (ni, nj) != (i, j)
+        )
+        for i in range(rows)
+        for j in range(cols)
+    )
@@ -1,31 +1,48 @@
+import os
 import sys
-try:
-    import pygame
-    import pygame_menu
-except ImportError:
-    print('''
+from importlib.util import find_spec
+import startup
+import config
+
+
+def main():
+    startup.install()
+    if find_spec('pygame') is None or find_spec('pygame_menu') is None:
+        print('''
 Some required Python modules are not installed:
     - pygame
     - pygame_menu
 You can use `pip install -r requirements.txt` to install all required modules.
 ''')
-    sys.exit(0)
+        sys.exit(0)
 
-from mainmenu import MainMenu
-import config
+    import pygame
+    from mainmenu import MainMenu
 
+    if config.PROFILE or os.environ.get('TICTACTOE_PROFILE'):
+        import profiler
+        profiler.enable(config.PROFILE_FILE)
 
-def main():
     pygame.init()
 
     pygame.display.set_caption("TicTacToe by n1tr0xs")
 
-    main_menu = MainMenu(
-        'Main Menu',
-        *config.MENU_WINDOW_SIZE,
-        theme=config.menu_theme,
-    )
-    main_menu.run()
+    store = None
+    if config.STATS_DB is not None:
+        import stats
+        store = stats.open_store(config.STATS_DB)
+
+    try:
+        main_menu = MainMenu(
+            'Main Menu',
+            *config.MENU_WINDOW_SIZE,
+            theme=config.get_menu_theme(),
+        )
+        startup.report('main menu created')
+        main_menu.run()
+    finally:
+        if store is not None:
+            store.close()
 
     pygame.quit()
 
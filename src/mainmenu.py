@@ -1,6 +1,5 @@
 import pygame_menu
 from menu import Menu
-from modemenu import ModeMenu
 
 
 class MainMenu(Menu):
@@ -13,5 +12,7 @@ class MainMenu(Menu):
         '''
         Runs ModeMenu.
         '''
+        from modemenu import ModeMenu
+
         ModeMenu('Mode menu', self._width, self._height, self._theme).run()
         self.set_mode()
@@ -0,0 +1,348 @@
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache
+from board import Board
+from bot import Bot
+from lines import DIRECTIONS, nearby_only, neighbours
+
+
+class Node:
+    '''
+    Node of Monte Carlo search tree.
+
+    :param move: flat cell index of the move leading to node.
+    :param parent: parent node.
+    :param sign: sign which made the move.
+    :param result: 'X', 'O' or 'Tie' if game ended by the move, else None.
+    '''
+    __slots__ = ('move', 'parent', 'sign', 'result', 'children', 'untried', 'visits', 'wins')
+
+    def __init__(self, move: int | None, parent: 'Node | None', sign: str, result: str | None = None) -> None:
+        self.move = move
+        self.parent = parent
+        self.sign = sign
+        self.result = result
+        self.children = []
+        # moves not expanded yet, filled on the first visit
+        self.untried = None
+        self.visits = 0
+        # wins of `sign`, ties count as half
+        self.wins = 0.0
+
+
+@cache
+def _rays(rows: int, cols: int, k: int) -> tuple[tuple[tuple[tuple[int, ...], tuple[int, ...]], ...], ...]:
+    '''
+    Returns cells up to k - 1 steps away from every cell.
+
+    :return: `rays[index]` is ((forward cells, backward cells), ...) per direction.
+    '''
+    rays = []
+    for i in range(rows):
+        for j in range(cols):
+            rays.append(tuple(
+                tuple(
+                    tuple(
+                        (i + di * n * step) * cols + j + dj * n * step
+                        for n in range(1, k)
+                        if 0 <= i + di * n * step < rows and 0 <= j + dj * n * step < cols
+                    )
+                    for step in (1, -1)
+                )
+                for di, dj in DIRECTIONS
+            ))
+    return tuple(rays)
+
+
+class MonteCarlo:
+    '''
+    UCT tree search from one position.
+    Tree is kept between searches, so known subtree is reused after turns.
+
+    :param rows: cells along the first board index.
+    :param cols: cells along the second board index.
+    :param k: signs in a row to win.
+    :param exploration: UCT exploration constant.
+    :param seed: seed of random playouts.
+    '''
+
+    def __init__(self, rows: int, cols: int, k: int, exploration: float = 1.4, seed: int | None = None) -> None:
+        self._rows, self._cols, self._k = rows, cols, k
+        self._exploration = exploration
+        self._rng = random.Random(seed)
+        self._rays = _rays(rows, cols, k)
+        self._nearby_only = nearby_only(rows, cols)
+        self._near = neighbours(rows, cols)
+        self._cells = [None] * (rows * cols)
+        self._empty = rows * cols
+        self._moves = []
+        self.root = Node(None, None, 'O')
+
+    def get_moves(self) -> list[tuple[int, int]]:
+        '''
+        Returns moves leading to the root position.
+        '''
+        return list(self._moves)
+
+    def advance(self, moves: list[tuple[int, int]]) -> None:
+        '''
+        Moves root to position after `moves` keeping searched subtree.
+
+        :param moves: (i, j) cells following the current root position.
+        '''
+        for i, j in moves:
+            index = i * self._cols + j
+            sign = 'O' if self.root.sign == 'X' else 'X'
+            self._cells[index] = sign
+            self._empty -= 1
+            self._moves.append((i, j))
+            for child in self.root.children:
+                if child.move == index:
+                    self.root = child
+                    break
+            else:
+                self.root = Node(index, None, sign, self._result(self._cells, index, sign, self._empty))
+            self.root.parent = None
+
+    def _result(self, cells: list[str | None], index: int, sign: str, empty: int) -> str | None:
+        '''
+        Returns game result after `sign` was placed on `index`.
+
+        :param empty: count of empty cells after the move.
+        '''
+        k = self._k
+        for forward, backward in self._rays[index]:
+            count = 1
+            for other in forward:
+                if cells[other] != sign:
+                    break
+                count += 1
+            for other in backward:
+                if cells[other] != sign:
+                    break
+                count += 1
+            if count >= k:
+                return sign
+        if empty == 0:
+            return 'Tie'
+        return None
+
+    def _candidates(self, cells: list[str | None]) -> list[int]:
+        '''
+        Returns moves to expand in position.
+        '''
+        empty = [index for index, sign in enumerate(cells) if sign is None]
+        if self._nearby_only:
+            near = self._near
+            nearby = [
+                index for index in empty
+                if any(cells[other] is not None for other in near[index])
+            ]
+            if nearby:
+                empty = nearby
+            elif len(empty) == len(cells):
+                # the first move is made in the centre
+                empty = [(self._rows // 2) * self._cols + self._cols // 2]
+        self._rng.shuffle(empty)
+        return empty
+
+    def _select(self, node: Node) -> Node:
+        '''
+        Returns child with the best upper confidence bound.
+        '''
+        scale = self._exploration * math.sqrt(math.log(node.visits))
+        return max(
+            node.children,
+            key=lambda child: child.wins / child.visits + scale / math.sqrt(child.visits),
+        )
+
+    def playout(self) -> None:
+        '''
+        Runs one selection, expansion, random playout and backpropagation.
+        '''
+        cells = self._cells[:]
+        empty = self._empty
+        node = self.root
+        # selection
+        while node.result is None and node.untried is not None and not node.untried:
+            node = self._select(node)
+            cells[node.move] = node.sign
+            empty -= 1
+        # expansion
+        if node.result is None:
+            if node.untried is None:
+                node.untried = self._candidates(cells)
+            move = node.untried.pop()
+            sign = 'O' if node.sign == 'X' else 'X'
+            cells[move] = sign
+            empty -= 1
+            child = Node(move, node, sign, self._result(cells, move, sign, empty))
+            node.children.append(child)
+            node = child
+        # random playout
+        result = node.result
+        if result is None:
+            free = [index for index, value in enumerate(cells) if value is None]
+            sign = node.sign
+            rng = self._rng
+            while result is None:
+                sign = 'O' if sign == 'X' else 'X'
+                pick = rng.randrange(len(free))
+                move = free[pick]
+                free[pick] = free[-1]
+                free.pop()
+                cells[move] = sign
+                result = self._result(cells, move, sign, len(free))
+        # backpropagation
+        while node is not None:
+            node.visits += 1
+            if result == node.sign:
+                node.wins += 1
+            elif result == 'Tie':
+                node.wins += 0.5
+            node = node.parent
+
+    def search(self, deadline: float, playouts: int | None = None, cancelled=lambda: False) -> int:
+        '''
+        Runs playouts until deadline or playouts budget is over.
+
+        :param deadline: `time.perf_counter()` value to stop at.
+        :param playouts: maximum count of playouts.
+        :param cancelled: callable returning True to stop early.
+        :return: count of made playouts.
+        '''
+        if self.root.result is not None:
+            return 0
+        done = 0
+        while (playouts is None or done < playouts) \
+                and not (done & 15 == 0 and (time.perf_counter() > deadline or cancelled())):
+            self.playout()
+            done += 1
+        return done
+
+    def root_stats(self) -> dict[int, tuple[int, float]]:
+        '''
+        Returns statistics of root moves.
+
+        :return: flat cell index -> (visits, wins).
+        '''
+        return {child.move: (child.visits, child.wins) for child in self.root.children}
+
+
+def _search(
+    rows: int,
+    cols: int,
+    k: int,
+    moves: list[tuple[int, int]],
+    time_limit: float,
+    playouts: int | None,
+    seed: int,
+) -> tuple[dict[int, tuple[int, float]], int]:
+    '''
+    Searches position in worker process.
+
+    :return: (root statistics, count of playouts).
+    '''
+    tree = MonteCarlo(rows, cols, k, seed=seed)
+    tree.advance(moves)
+    done = tree.search(time.perf_counter() + time_limit, playouts)
+    return tree.root_stats(), done
+
+
+@cache
+def _pool(processes: int) -> ProcessPoolExecutor:
+    '''
+    Returns process pool shared by bots.
+    '''
+    return ProcessPoolExecutor(processes)
+
+
+class MCTSBot(Bot):
+    '''
+    Bot which chooses turns by Monte Carlo tree search with UCT selection.
+    Searched tree is reused on the next turn.
+    With `processes` > 1 independent trees are searched in worker processes
+    and their root statistics are summed (root parallelization).
+
+    :param sign: sign ('X' or 'O') for bot
+    :param board: board to play TicTacToe.
+    :param time_limit: seconds to think on each turn.
+    :param playouts: maximum playouts on each turn, None for time limit only.
+    :param processes: processes searching in parallel, including this one.
+    '''
+
+    def __init__(
+        self,
+        sign: str,
+        board: Board,
+        time_limit: float = 1.0,
+        playouts: int | None = None,
+        processes: int = 1,
+    ) -> None:
+        super().__init__(sign, board)
+        self._time_limit = time_limit
+        self._playouts = playouts
+        self._processes = processes
+        self._cancelled = False
+        self.stats = {'playouts': 0, 'playouts_per_second': 0.0, 'visits': 0, 'value': 0.0}
+
+    def generate_checks(self) -> None:
+        super().generate_checks()
+        rows, cols = self._board.get_shape()
+        self._tree = MonteCarlo(rows, cols, self._board.get_k())
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def get_move(self) -> tuple[int, int] | None:
+        '''
+        Chooses cell for the next bot turn by tree search.
+
+        :return: (i, j) cell or None if there are no empty cells.
+        '''
+        if (cell := self.get_forced_move()) is not None:
+            return cell
+        if self._board.count_empty() == 0:
+            return None
+        moves = self._board.get_moves()
+        known = self._tree.get_moves()
+        if moves[:len(known)] != known:
+            self.generate_checks()
+            known = []
+        self._tree.advance(moves[len(known):])
+
+        rows, cols = self._board.get_shape()
+        start = time.perf_counter()
+        workers = []
+        playouts = self._playouts
+        if self._processes > 1:
+            if playouts is not None:
+                playouts = max(playouts // self._processes, 1)
+            pool = _pool(self._processes - 1)
+            workers = [
+                pool.submit(
+                    _search, rows, cols, self._board.get_k(), moves,
+                    self._time_limit, playouts, random.getrandbits(32),
+                )
+                for _ in range(self._processes - 1)
+            ]
+        done = self._tree.search(start + self._time_limit, playouts, lambda: self._cancelled)
+        stats = self._tree.root_stats()
+        for worker in workers:
+            worker_stats, worker_done = worker.result()
+            done += worker_done
+            for move, (visits, wins) in worker_stats.items():
+                total_visits, total_wins = stats.get(move, (0, 0.0))
+                stats[move] = (total_visits + visits, total_wins + wins)
+
+        elapsed = time.perf_counter() - start
+        self.stats['playouts'] = done
+        self.stats['playouts_per_second'] = done / elapsed if elapsed > 0 else 0.0
+        if not stats:
+            return super().get_move()
+        move, (visits, wins) = max(stats.items(), key=lambda item: item[1][0])
+        self.stats['visits'] = visits
+        self.stats['value'] = wins / visits
+        return divmod(move, cols)
@@ -35,7 +35,11 @@ class Menu:
     def set_mode(self) -> pygame.surface.Surface:
         '''
         Wrapper for pygame.display.set_mode.
+        Existing window of the same size is reused.
         '''
+        surface = pygame.display.get_surface()
+        if (surface is not None) and (surface.get_size() == (self._width, self._height)):
+            return surface
         return pygame.display.set_mode((self._width, self._height))
 
     def add_button(self, *args, **kwargs) -> pygame_menu.widgets.Button:
@@ -1,7 +1,5 @@
 import config
 from menu import Menu
-from gameplayerplayerlocal import GamePlayerPlayerLocal
-from gameplayerbot import GamePlayerBot
 
 
 class ModeMenu(Menu):
@@ -9,12 +7,15 @@ class ModeMenu(Menu):
     Mode select menu.
     Available modes:
         1. Player vs Player local
-        2. Player vs Bot
+        2. Player vs Player through network server
+        3. Player vs Bot
+    Game modes are imported when selected.
     '''
 
     def __init__(self, title, width, height, theme):
         super().__init__(title, width, height, theme)
         self._menu.add.button('Player vs Player (local)', self._player_player_local)
+        self._menu.add.button('Player vs Player (network)', self._player_player_network)
         self._menu.add.button('Player vs Bot', self._player_bot)
         self._menu.add.button('Back', self._menu.disable)
 
@@ -22,7 +23,25 @@ class ModeMenu(Menu):
         '''
         Runs Player vs Player (local) mode.
         '''
-        GamePlayerPlayerLocal(*config.GAME_WINDOW_SIZE, config.FPS).run()
+        from gameplayerplayerlocal import GamePlayerPlayerLocal
+
+        GamePlayerPlayerLocal(
+            *config.GAME_WINDOW_SIZE, config.FPS,
+            config.CELLS, config.WIN_LENGTH, config.MOVE_LOG,
+        ).run()
+        self._menu.disable()
+
+    def _player_player_network(self) -> None:
+        '''
+        Runs Player vs Player (network) mode.
+        '''
+        from gameplayernetwork import GamePlayerNetwork
+
+        GamePlayerNetwork(
+            *config.GAME_WINDOW_SIZE, config.FPS,
+            config.SERVER_HOST, config.SERVER_PORT,
+            config.CELLS, config.WIN_LENGTH, config.MOVE_LOG,
+        ).run()
         self._menu.disable()
 
     def _player_bot(self) -> None:
@@ -39,15 +58,42 @@ class SignMenu(Menu):
     '''
 
     def __init__(self, title, width, height, theme):
+        from bots import DIFFICULTIES
+
         super().__init__(title, width, height, theme)
+        self._difficulty = config.DIFFICULTY
+        self._menu.add.selector(
+            'Bot: ',
+            [(name, name) for name in DIFFICULTIES],
+            default=list(DIFFICULTIES).index(self._difficulty),
+            onchange=self._set_difficulty,
+        )
         self._menu.add.button('Start with sign X', self._sign_X)
         self._menu.add.button('Start with sign O', self._sign_O)
         self._menu.add.button('Back', self._menu.disable)
 
+    def _set_difficulty(self, selected: tuple, difficulty: str) -> None:
+        '''
+        Remembers selected bot difficulty.
+        '''
+        self._difficulty = difficulty
+
     def _sign_X(self) -> None:
-        GamePlayerBot(*config.GAME_WINDOW_SIZE, config.FPS, 'X').run()
-        self.set_mode()
+        self._play('X')
 
     def _sign_O(self) -> None:
-        GamePlayerBot(*config.GAME_WINDOW_SIZE, config.FPS, 'O').run()
+        self._play('O')
+
+    def _play(self, sign: str) -> None:
+        '''
+        Runs Player vs Bot mode.
+
+        :param sign: player sign.
+        '''
+        from gameplayerbot import GamePlayerBot
+
+        GamePlayerBot(
+            *config.GAME_WINDOW_SIZE, config.FPS, sign,
+            config.CELLS, config.WIN_LENGTH, self._difficulty, config.MOVE_LOG,
+        ).run()
         self.set_mode()
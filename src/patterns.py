@@ -0,0 +1,173 @@
+'''
+Pattern weights learned by `train.py`.
+
+Position value for the player who made the last turn is a sum of weights
+of sign patterns on all winning segments. Pattern of segment is a base-3
+number of its cells, 1 for signs of the player and 2 for the other ones,
+so weight of pattern is found by indexing the table and value change of
+a turn is read for segments through its cell only.
+'''
+import array
+import glob
+import mmap
+import os
+import struct
+import sys
+from functools import cache
+from board import Board
+from lines import segments
+
+WEIGHTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'weights')
+
+MAGIC = b'TTTW'
+# magic, version, rows, cols, k, trained games; little-endian float32 per pattern follows
+HEADER = struct.Struct('<4sBBBBI')
+VERSION = 1
+
+
+@cache
+def cell_powers(rows: int, cols: int, k: int) -> tuple[tuple[tuple[int, int], ...], ...]:
+    '''
+    Returns segments through every cell with place value of the cell in segment pattern.
+
+    :param rows: cells along the first board index.
+    :param cols: cells along the second board index.
+    :param k: cells in a row required to win.
+    :return: `powers[i * cols + j]` is a tuple of (segment number, 3 ** position in segment).
+    '''
+    powers = [[] for _ in range(rows * cols)]
+    for number, segment in enumerate(segments(rows, cols, k)):
+        for position, (i, j) in enumerate(segment):
+            powers[i * cols + j].append((number, 3 ** position))
+    return tuple(tuple(cell) for cell in powers)
+
+
+@cache
+def features(k: int) -> tuple[tuple[int | None, ...], int]:
+    '''
+    Returns weights shared by patterns.
+    Reversed patterns have the same weight, empty pattern has none.
+
+    :param k: cells in a row required to win.
+    :return: (feature, count of features) where weight of pattern `code`
+        is `weights[feature[code]]`.
+    '''
+    feature, index = [None], {}
+    for code in range(1, 3 ** k):
+        digits = [code // 3 ** position % 3 for position in range(k)]
+        reverse = sum(digit * 3 ** position for position, digit in enumerate(reversed(digits)))
+        feature.append(index.setdefault(min(code, reverse), len(index)))
+    return tuple(feature), len(index)
+
+
+def expand(weights: list[float], k: int) -> list[float]:
+    '''
+    Returns weight of every pattern from weights of features.
+    '''
+    return [0.0 if f is None else weights[f] for f in features(k)[0]]
+
+
+def collapse(table, k: int) -> list[float]:
+    '''
+    Returns weights of features from weight of every pattern, reverse of `expand()`.
+    '''
+    feature, count = features(k)
+    weights = [0.0] * count
+    for code, f in enumerate(feature):
+        if f is not None:
+            weights[f] = table[code]
+    return weights
+
+
+def segment_codes(board: Board, sign: str) -> list[int]:
+    '''
+    Returns pattern of every winning segment of board for player with sign.
+    '''
+    rows, cols = board.get_shape()
+    powers = cell_powers(rows, cols, board.get_k())
+    codes = [0] * len(board.get_segments())
+    for i in range(rows):
+        for j in range(cols):
+            if (cell := board.get(i, j)) is not None:
+                code = 1 if cell == sign else 2
+                for line, power in powers[i * cols + j]:
+                    codes[line] += power * code
+    return codes
+
+
+def gain(table, codes: list[int], powers: tuple[tuple[int, int], ...]) -> float:
+    '''
+    Returns change of position value after player placed sign on cell.
+
+    :param table: weight of every pattern.
+    :param codes: pattern of every segment for the player.
+    :param powers: `cell_powers()` of the cell.
+    '''
+    total = 0.0
+    for line, power in powers:
+        old = codes[line]
+        total += table[old + power] - table[old]
+    return total
+
+
+def write_weights(path: str, rows: int, cols: int, k: int, table: list[float], games: int) -> None:
+    '''
+    Writes weight of every pattern.
+
+    :param games: count of games the weights were trained on.
+    '''
+    values = array.array('f', table)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, rows, cols, k, games))
+        file.write(values.tobytes())
+
+
+class PatternWeights:
+    '''
+    Memory-mapped table of pattern weights.
+    Built by `train.py`.
+
+    :param path: weights file.
+    '''
+
+    def __init__(self, path: str) -> None:
+        with open(path, 'rb') as file:
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, rows, cols, k, games = HEADER.unpack_from(self._data)
+        if (magic != MAGIC) or (version != VERSION) or len(self._data) != HEADER.size + 4 * 3 ** k:
+            raise ValueError(f'{path} is not a weights file')
+        self._shape = (rows, cols)
+        self._k = k
+        self.games = games
+        if sys.byteorder == 'big':
+            self.table = array.array('f', self._data[HEADER.size:])
+            self.table.byteswap()
+        else:
+            self.table = memoryview(self._data)[HEADER.size:].cast('f')
+
+    @staticmethod
+    def path(rows: int, cols: int, k: int) -> str:
+        '''
+        Returns weights file for board parameters in `WEIGHTS_DIR`.
+        '''
+        return os.path.join(WEIGHTS_DIR, f'{rows}x{cols}x{k}.weights')
+
+    @staticmethod
+    @cache
+    def load(rows: int, cols: int, k: int) -> 'PatternWeights | None':
+        '''
+        Returns weights for board parameters from `WEIGHTS_DIR`.
+        Patterns do not depend on board size, so weights of other board
+        with the same k are used if there are no weights for this one.
+
+        :return: PatternWeights or None if there are no weights.
+        '''
+        path = PatternWeights.path(rows, cols, k)
+        if not os.path.exists(path):
+            if not (paths := sorted(glob.glob(os.path.join(WEIGHTS_DIR, f'*x*x{k}.weights')))):
+                return None
+            path = paths[0]
+        return PatternWeights(path)
@@ -0,0 +1,142 @@
+'''
+Opt-in timing of game hot paths.
+
+Enabled by `config.PROFILE` or TICTACTOE_PROFILE=1. While disabled
+`active` is None and nothing is wrapped, so there is no overhead.
+'''
+import json
+import logging
+import os
+import time
+from collections import deque
+from collections.abc import Callable
+from logging.handlers import RotatingFileHandler
+
+active = None
+
+
+class Profiler:
+    '''
+    Keeps last timings of named sections and last bot search statistics.
+
+    :param path: rolling stats file, created with its directory, None to keep stats only in memory.
+    :param window: count of last timings kept per section.
+    :param interval: seconds between lines written to stats file.
+    :param max_bytes: size of stats file before it is rotated.
+    '''
+
+    def __init__(
+        self,
+        path: str | None = None,
+        window: int = 120,
+        interval: float = 5.0,
+        max_bytes: int = 1 << 20,
+    ) -> None:
+        self._window = window
+        self._interval = interval
+        self._sections = {}
+        self.search = {}
+        self.moves = deque(maxlen=window)
+        self._frames = deque(maxlen=window)
+        self._written = time.perf_counter()
+        self._logger = None
+        if path is not None:
+            self._logger = logging.getLogger(f'{__name__}.{id(self)}')
+            self._logger.propagate = False
+            self._logger.setLevel(logging.INFO)
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._logger.addHandler(RotatingFileHandler(path, maxBytes=max_bytes, backupCount=1))
+
+    def record(self, name: str, seconds: float) -> None:
+        '''
+        Stores duration of section.
+        Can be called from any thread.
+        '''
+        if (times := self._sections.get(name)) is None:
+            times = self._sections.setdefault(name, deque(maxlen=self._window))
+        times.append(seconds)
+
+    def timed(self, name: str, function: Callable) -> Callable:
+        '''
+        Wraps function to record its duration under `name`.
+        '''
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - start)
+        return wrapper
+
+    def frame(self) -> None:
+        '''
+        Marks the end of mainloop iteration, writes stats file line when it is time.
+        '''
+        now = time.perf_counter()
+        self._frames.append(now)
+        if now - self._written >= self._interval:
+            self.write()
+
+    def write(self) -> None:
+        '''
+        Appends current statistics to stats file.
+        '''
+        self._written = time.perf_counter()
+        if self._logger is not None:
+            self._logger.info(json.dumps(self.summary()))
+
+    def game_finished(self, moves: int) -> None:
+        '''
+        Stores count of moves in finished game.
+        '''
+        self.moves.append(moves)
+
+    def summary(self) -> dict:
+        '''
+        Returns current statistics.
+
+        :return: dict with frames per second, (last, mean, max) milliseconds
+            per section, last bot search stats and mean moves per game.
+        '''
+        frames = self._frames
+        fps = 0.0
+        if len(frames) > 1 and frames[-1] > frames[0]:
+            fps = (len(frames) - 1) / (frames[-1] - frames[0])
+        sections = {
+            name: (times[-1] * 1000, sum(times) / len(times) * 1000, max(times) * 1000)
+            for name, times in list(self._sections.items())
+            if times
+        }
+        return {
+            'time': time.time(),
+            'fps': fps,
+            'sections': sections,
+            'search': dict(self.search),
+            'moves': sum(self.moves) / len(self.moves) if self.moves else 0.0,
+        }
+
+    def lines(self) -> list[str]:
+        '''
+        Returns summary as text lines for debug overlay.
+        '''
+        summary = self.summary()
+        lines = [f"fps {summary['fps']:.1f}  moves/game {summary['moves']:.1f}"]
+        for name, (last, mean, peak) in sorted(summary['sections'].items()):
+            lines.append(f'{name:<6} {last:6.2f} {mean:6.2f} {peak:7.2f} ms')
+        if summary['search']:
+            lines.append(' '.join(
+                f'{key} {value:.3g}' if isinstance(value, float) else f'{key} {value}'
+                for key, value in summary['search'].items()
+            ))
+        return lines
+
+
+def enable(path: str | None = None) -> Profiler:
+    '''
+    Creates profiler used by games created after this call.
+
+    :param path: rolling stats file.
+    '''
+    global active
+    active = Profiler(path)
+    return active
@@ -0,0 +1,164 @@
+'''
+Compact binary log of finished games.
+
+File starts with FILE_HEADER, then records follow one after another:
+    RECORD            - rows, cols, k, count of moves
+    count bytes       - move indexes `i * cols + j` in turn order
+
+Usage:
+    python replay.py games.log
+'''
+import argparse
+import os
+import struct
+from collections.abc import Iterator
+from board import Board
+
+MAGIC = b'TTTR'
+VERSION = 1
+# magic, version
+FILE_HEADER = struct.Struct('<4sB')
+# rows, cols, k, moves count
+RECORD = struct.Struct('<BBBH')
+# one byte per move
+MAX_CELLS = 256
+
+
+def encode(board: Board) -> bytes:
+    '''
+    Encodes moves of the board as one record.
+
+    :param board: board with made turns.
+    :return: record bytes.
+    '''
+    rows, cols = board.get_shape()
+    return encode_moves(rows, cols, board.get_k(), bytes(i * cols + j for i, j in board.get_moves()))
+
+
+def encode_moves(rows: int, cols: int, k: int, moves: bytes) -> bytes:
+    '''
+    Encodes game given as move indexes as one record.
+
+    :param moves: move indexes `i * cols + j` in turn order.
+    :return: record bytes.
+    '''
+    if rows * cols > MAX_CELLS:
+        raise ValueError(f'{rows}x{cols} board does not fit one byte per move')
+    return RECORD.pack(rows, cols, k, len(moves)) + moves
+
+
+class MoveLogWriter:
+    '''
+    Appends games to log file through write buffer.
+    Record cut by interrupted write at the end of existing log is removed.
+    Can be used as context manager.
+
+    :param path: log file, created with its directory if it does not exist.
+    :param buffer_size: bytes kept in memory before writing to disk.
+    '''
+
+    def __init__(self, path: str, buffer_size: int = 1 << 16) -> None:
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, 'r+b') as file:
+                _check_header(file, path)
+                file.truncate(_records_end(file))
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, 'ab', buffering=buffer_size)
+        if self._file.tell() == 0:
+            self._file.write(FILE_HEADER.pack(MAGIC, VERSION))
+
+    def write(self, board: Board) -> None:
+        '''
+        Appends finished game.
+        '''
+        self._file.write(encode(board))
+
+    def write_records(self, data: bytes) -> None:
+        '''
+        Appends already encoded records.
+        '''
+        self._file.write(data)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> 'MoveLogWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _check_header(file, path: str) -> None:
+    '''
+    Reads file header and checks it.
+    '''
+    header = file.read(FILE_HEADER.size)
+    if len(header) < FILE_HEADER.size or FILE_HEADER.unpack(header) != (MAGIC, VERSION):
+        raise ValueError(f'{path} is not a move log')
+
+
+def _records_end(file) -> int:
+    '''
+    Returns offset after the last whole record, file is read from its current offset.
+    '''
+    end = file.tell()
+    while len(header := file.read(RECORD.size)) == RECORD.size:
+        count = RECORD.unpack(header)[3]
+        if len(file.read(count)) < count:
+            break
+        end = file.tell()
+    return end
+
+
+def read_games(path: str, buffer_size: int = 1 << 16) -> Iterator[tuple[int, int, int, bytes]]:
+    '''
+    Streams records of the log without loading whole file.
+
+    :param path: log file.
+    :param buffer_size: bytes read from disk at once.
+    :return: generator of (rows, cols, k, move indexes).
+    '''
+    with open(path, 'rb', buffering=buffer_size) as file:
+        _check_header(file, path)
+        while (header := file.read(RECORD.size)):
+            if len(header) < RECORD.size:
+                # record cut by interrupted write
+                return
+            rows, cols, k, count = RECORD.unpack(header)
+            moves = file.read(count)
+            if len(moves) < count:
+                return
+            yield rows, cols, k, moves
+
+
+def replay(path: str) -> Iterator[Board]:
+    '''
+    Streams games of the log replayed on boards.
+
+    :param path: log file.
+    :return: generator of finished boards.
+    :raises ValueError: if game has turn on occupied cell.
+    '''
+    for rows, cols, k, moves in read_games(path):
+        board = Board(rows, cols, k)
+        for move in moves:
+            board.push(*divmod(move, cols))
+        yield board
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Replays move log and prints score.')
+    parser.add_argument('path')
+    args = parser.parse_args()
+    score = {'X': 0, 'O': 0, 'Tie': 0, None: 0}
+    for board in replay(args.path):
+        score[board.result()] += 1
+    print(f"X: {score['X']} O: {score['O']} Tie: {score['Tie']} unfinished: {score[None]}")
+
+
+if __name__ == '__main__':
+    main()
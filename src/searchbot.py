@@ -0,0 +1,287 @@
+import time
+from collections import OrderedDict
+from board import Board
+from book import OpeningBook
+from bot import Bot
+from lines import cell_segments, nearby_only
+from symmetry import from_canonical, to_canonical
+
+# score of won position, remaining empty cells are added to prefer fast wins
+WIN = 1 << 40
+
+
+class TranspositionTable:
+    '''
+    Bounded table of searched positions.
+    The oldest entry is evicted when table is full.
+
+    :param size: maximum count of stored positions.
+    '''
+    EXACT = 0
+    LOWER = 1
+    UPPER = 2
+
+    def __init__(self, size: int = 1 << 18) -> None:
+        self._size = size
+        self._entries = OrderedDict()
+        self.hits = 0
+
+    def get(self, key: int) -> tuple[int, int, int, tuple[int, int] | None] | None:
+        '''
+        Returns stored entry for position.
+
+        :param key: position hash.
+        :return: (depth, value, flag, best move) or None.
+        '''
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+        return entry
+
+    def put(self, key: int, depth: int, value: int, flag: int, move: tuple[int, int] | None) -> None:
+        '''
+        Stores entry for position.
+
+        :param key: position hash.
+        :param depth: searched depth.
+        :param value: position value for side to move.
+        :param flag: EXACT, LOWER or UPPER bound.
+        :param move: best move found.
+        '''
+        entries = self._entries
+        if key in entries:
+            entries[key] = (depth, value, flag, move)
+            return
+        if len(entries) >= self._size:
+            entries.popitem(last=False)
+        entries[key] = (depth, value, flag, move)
+
+    def clear(self) -> None:
+        '''
+        Removes all entries.
+        '''
+        self._entries.clear()
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _Timeout(Exception):
+    '''
+    Raised inside search when time budget is over.
+    '''
+
+
+class SearchBot(Bot):
+    '''
+    Bot which searches game tree with negamax and alpha-beta pruning.
+    Uses iterative deepening to answer within `time_limit` and `max_nodes`.
+    Positions from opening book are answered without search.
+
+    :param sign: sign ('X' or 'O') for bot
+    :param board: board to play TicTacToe.
+    :param time_limit: seconds to think on each turn.
+    :param table_size: maximum positions in transposition table.
+    :param max_nodes: maximum searched positions on each turn, None for time limit only.
+    '''
+
+    def __init__(
+        self,
+        sign: str,
+        board: Board,
+        time_limit: float = 1.0,
+        table_size: int = 1 << 18,
+        max_nodes: int | None = None,
+    ) -> None:
+        super().__init__(sign, board)
+        self._time_limit = time_limit
+        self._max_nodes = max_nodes
+        self._table = TranspositionTable(table_size)
+        self._cancelled = False
+        self.stats = {'nodes': 0, 'depth': 0, 'hits': 0, 'value': 0}
+
+    def generate_checks(self) -> None:
+        super().generate_checks()
+        rows, cols = self._board.get_shape()
+        k = self._board.get_k()
+        self._rows, self._cols, self._k = rows, cols, k
+        self._through = cell_segments(rows, cols, k)
+        self._book = OpeningBook.load(rows, cols, k)
+        self._nearby_only = nearby_only(rows, cols)
+        # value of segment by (X count, O count) from X point of view
+        weights = [0] + [10 ** count for count in range(k)]
+        self._values = [
+            [
+                0 if x and o else weights[x] - weights[o]
+                for o in range(k + 1)
+            ]
+            for x in range(k + 1)
+        ]
+
+    def _load(self) -> int:
+        '''
+        Replays board turns on search board.
+        Search makes and undoes turns on it, so positions are never copied.
+
+        :return: count of empty cells.
+        '''
+        board = Board(self._rows, self._cols, self._k)
+        for cell in self._board.get_moves():
+            board.push(*cell)
+        self._search = board
+        counts = board.get_threats().counts
+        self._xs, self._os = counts['X'], counts['O']
+        values = self._values
+        self._eval = sum(values[x][o] for x, o in zip(self._xs, self._os))
+        return board.count_empty()
+
+    def _make(self, i: int, j: int, sign: str) -> bool:
+        '''
+        Places sign on search board.
+
+        :return: True if the sign won by this move.
+        '''
+        gain = self._gain(i, j, sign)
+        self._eval += gain if sign == 'X' else -gain
+        self._search.push(i, j)
+        return self._search.is_winner(sign)
+
+    def _unmake(self, sign: str) -> None:
+        '''
+        Removes the last sign from search board.
+        '''
+        i, j = self._search.pop()
+        gain = self._gain(i, j, sign)
+        self._eval -= gain if sign == 'X' else -gain
+
+    def _gain(self, i: int, j: int, sign: str) -> int:
+        '''
+        Estimates move value for `sign` without making it.
+        '''
+        xs, os = self._xs, self._os
+        values = self._values
+        gain = 0
+        for line in self._through[i][j]:
+            x, o = xs[line], os[line]
+            if sign == 'X':
+                gain += values[x + 1][o] - values[x][o]
+            else:
+                gain += values[x][o] - values[x][o + 1]
+        return gain
+
+    def _moves(self, sign: str, first: tuple[int, int] | None) -> list[tuple[int, int]]:
+        '''
+        Returns candidate moves ordered from the most promising.
+
+        :param sign: sign to move.
+        :param first: move to search first (from transposition table).
+        '''
+        board = self._search
+        moves = list(board.legal_moves(nearby=self._nearby_only))
+        if not moves:
+            moves = list(board.legal_moves())
+        moves.sort(key=lambda move: self._gain(*move, sign), reverse=True)
+        if first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    def _negamax(self, depth: int, alpha: int, beta: int, sign: str, empty: int) -> tuple[int, tuple[int, int] | None]:
+        '''
+        Searches position with alpha-beta pruning.
+
+        :param depth: plies left to search.
+        :param sign: sign to move.
+        :param empty: count of empty cells.
+        :return: (value for side to move, best move)
+        '''
+        nodes = self.stats['nodes'] = self.stats['nodes'] + 1
+        if (nodes & 63 == 0) and (
+            self._cancelled
+            or (self._max_nodes is not None and nodes >= self._max_nodes)
+            or time.perf_counter() > self._deadline
+        ):
+            raise _Timeout
+        if depth == 0:
+            return (self._eval if sign == 'X' else -self._eval), None
+
+        alpha_orig = alpha
+        best_move = None
+        # transposition table is shared by symmetric positions
+        key, transform = self._search.zobrist()
+        if (entry := self._table.get(key)) is not None:
+            entry_depth, value, flag, best_move = entry
+            if best_move is not None:
+                best_move = from_canonical(self._rows, self._cols, transform, best_move)
+            if entry_depth >= depth:
+                if flag == TranspositionTable.EXACT:
+                    return value, best_move
+                if flag == TranspositionTable.LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value, best_move
+
+        other = 'O' if sign == 'X' else 'X'
+        best_value = -WIN * 2
+        for move in self._moves(sign, best_move):
+            if self._make(*move, sign):
+                value = WIN + empty - 1
+            elif empty == 1:
+                value = 0
+            else:
+                value = -self._negamax(depth - 1, -beta, -alpha, other, empty - 1)[0]
+            self._unmake(sign)
+            if value > best_value:
+                best_value, best_move = value, move
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        if best_value <= alpha_orig:
+            flag = TranspositionTable.UPPER
+        elif best_value >= beta:
+            flag = TranspositionTable.LOWER
+        else:
+            flag = TranspositionTable.EXACT
+        self._table.put(
+            key, depth, best_value, flag,
+            to_canonical(self._rows, self._cols, transform, best_move),
+        )
+        return best_value, best_move
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def get_move(self) -> tuple[int, int] | None:
+        '''
+        Chooses cell for the next bot turn by iterative deepening search.
+
+        :return: (i, j) cell or None if there are no empty cells.
+        '''
+        if (self._book is not None) and (entry := self._book.lookup(self._board)) is not None:
+            return entry[0]
+        empty = self._load()
+        if empty == 0:
+            return None
+        self.stats = {'nodes': 0, 'depth': 0, 'hits': 0, 'value': 0}
+        hits = self._table.hits
+        self._deadline = time.perf_counter() + self._time_limit
+        best_move = None
+        for depth in range(1, empty + 1):
+            try:
+                value, move = self._negamax(depth, -WIN * 2, WIN * 2, self._sign, empty)
+            except _Timeout:
+                break
+            best_move = move
+            self.stats['depth'] = depth
+            self.stats['value'] = value
+            # game result is proven
+            if abs(value) >= WIN:
+                break
+        self.stats['hits'] = self._table.hits - hits
+        if best_move is None:
+            return super().get_move()
+        return best_move
@@ -0,0 +1,261 @@
+'''
+Asyncio TicTacToe server for network games.
+
+Protocol is line based, every message is one line of ASCII words.
+Client sends:
+    JOIN <rows> <cols> <k>    - wait for opponent on such board
+    MOVE <i> <j>              - make turn
+    QUIT                      - close connection
+Server sends:
+    WAIT                      - player is in matchmaking queue
+    START <sign> <rows> <cols> <k>
+    MOVE <i> <j>              - accepted turn of any player
+    RESULT <X|O|Tie>          - game finished
+    LEFT                      - opponent disconnected
+    ERROR <message>
+
+Usage:
+    python server.py --port 8765 --log games.log
+'''
+import argparse
+import asyncio
+from collections import deque
+from bitboard import BitBoard
+from replay import MoveLogWriter, encode_moves
+
+
+class Connection:
+    '''
+    State of one connected client.
+    '''
+    __slots__ = ('reader', 'writer', 'sign', 'session', 'queue')
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.sign = None
+        self.session = None
+        self.queue = None
+
+    def send(self, *words) -> None:
+        '''
+        Writes one message line to client.
+        '''
+        if not self.writer.is_closing():
+            self.writer.write(' '.join(map(str, words)).encode() + b'\n')
+
+
+class Session:
+    '''
+    One game between two connections.
+    Position is kept as compact `BitBoard` and turns as move indexes.
+    '''
+    __slots__ = ('board', 'players', 'moves')
+
+    def __init__(self, board: BitBoard, x: Connection | None, o: Connection | None) -> None:
+        self.board = board
+        self.players = {'X': x, 'O': o}
+        self.moves = bytearray()
+
+    def turn(self, i: int, j: int) -> None:
+        '''
+        Makes turn on empty cell.
+        '''
+        self.moves.append(i * self.board.get_shape()[1] + j)
+        self.board.turn(i, j)
+
+    def encode(self) -> bytes:
+        '''
+        Returns game as move log record.
+        '''
+        rows, cols = self.board.get_shape()
+        return encode_moves(rows, cols, self.board.get_k(), bytes(self.moves))
+
+    def broadcast(self, *words) -> None:
+        for player in self.players.values():
+            player.send(*words)
+
+
+class GameServer:
+    '''
+    Hosts many games in one process.
+    Players asking for the same board are matched in arrival order.
+
+    :param max_line: longest accepted message.
+    :param log: writer for finished games.
+    '''
+
+    def __init__(self, max_line: int = 64, log: MoveLogWriter | None = None) -> None:
+        self._max_line = max_line
+        self._log = log
+        self._queues = {}
+        self._server = None
+        self._tasks = set()
+        self.sessions = 0
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> tuple[str, int]:
+        '''
+        Starts listening.
+
+        :param port: port to listen, 0 to choose free one.
+        :return: (host, port) server is listening on.
+        '''
+        self._server = await asyncio.start_server(
+            self._handle, host, port, limit=self._max_line,
+        )
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self) -> None:
+        '''
+        Serves clients until cancelled.
+        '''
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        '''
+        Stops listening and closes client connections.
+        '''
+        self._server.close()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        '''
+        Serves one client connection.
+        '''
+        conn = Connection(reader, writer)
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        try:
+            while (line := await reader.readline()):
+                words = line.decode('ascii', 'replace').split()
+                if not words:
+                    continue
+                if words[0] == 'QUIT':
+                    break
+                self._dispatch(conn, words)
+                await writer.drain()
+        except ValueError:
+            conn.send('ERROR', 'line too long')
+        except (ConnectionError, asyncio.CancelledError):
+            # connection is cancelled by close(), task ends normally
+            pass
+        finally:
+            self._tasks.discard(task)
+            self._leave(conn)
+            writer.close()
+
+    def _dispatch(self, conn: Connection, words: list[str]) -> None:
+        '''
+        Handles one message of client.
+        '''
+        try:
+            match words:
+                case ['JOIN', rows, cols, k]:
+                    self._join(conn, int(rows), int(cols), int(k))
+                case ['MOVE', i, j]:
+                    self._move(conn, int(i), int(j))
+                case _:
+                    conn.send('ERROR', 'unknown command')
+        except ValueError:
+            conn.send('ERROR', 'bad number')
+
+    def _join(self, conn: Connection, rows: int, cols: int, k: int) -> None:
+        '''
+        Puts player into queue or starts game with waiting player.
+        '''
+        if not (1 <= k <= max(rows, cols)) or not (1 <= rows <= 16) or not (1 <= cols <= 16):
+            conn.send('ERROR', 'bad board')
+            return
+        self._leave(conn)
+        shape = (rows, cols, k)
+        queue = self._queues.setdefault(shape, deque())
+        if not queue:
+            queue.append(conn)
+            conn.queue = queue
+            conn.send('WAIT')
+            return
+        opponent = queue.popleft()
+        opponent.queue = None
+        session = Session(BitBoard(rows, cols, k), opponent, conn)
+        for sign, player in session.players.items():
+            player.sign = sign
+            player.session = session
+            player.send('START', sign, rows, cols, k)
+        self.sessions += 1
+
+    def _move(self, conn: Connection, i: int, j: int) -> None:
+        '''
+        Validates and makes turn.
+        '''
+        session = conn.session
+        if session is None:
+            conn.send('ERROR', 'not in game')
+            return
+        board = session.board
+        rows, cols = board.get_shape()
+        if board.get_turn() != conn.sign:
+            conn.send('ERROR', 'not your turn')
+        elif not (0 <= i < rows and 0 <= j < cols) or board.get(i, j) is not None:
+            conn.send('ERROR', 'bad cell')
+        else:
+            session.turn(i, j)
+            session.broadcast('MOVE', i, j)
+            if (result := board.result()) is not None:
+                session.broadcast('RESULT', result)
+                if self._log is not None:
+                    self._log.write_records(session.encode())
+                self._end(session)
+
+    def _end(self, session: Session) -> None:
+        '''
+        Detaches players from finished session.
+        '''
+        for player in session.players.values():
+            player.session = None
+            player.sign = None
+        self.sessions -= 1
+
+    def _leave(self, conn: Connection) -> None:
+        '''
+        Removes player from queue and current game.
+        '''
+        if conn.queue is not None:
+            conn.queue.remove(conn)
+            conn.queue = None
+        if (session := conn.session) is not None:
+            self._end(session)
+            for player in session.players.values():
+                if player is not conn:
+                    player.send('LEFT')
+
+
+async def serve(host: str, port: int, log: str | None = None) -> None:
+    writer = MoveLogWriter(log) if log else None
+    server = GameServer(log=writer)
+    host, port = await server.start(host, port)
+    print(f'Listening on {host}:{port}', flush=True)
+    try:
+        await server.serve_forever()
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Runs TicTacToe network server.')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--log', default=None, help='file to append finished games to')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.log))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
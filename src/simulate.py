@@ -0,0 +1,144 @@
+'''
+Headless bot vs bot tournaments.
+
+Usage:
+    python simulate.py 1000000 --x Easy --o Hard --openings 2 --log games.log
+'''
+import argparse
+import random
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from board import Board
+from bots import DIFFICULTIES, make_bot
+from replay import MoveLogWriter, encode
+
+
+def play_game(
+    bot_x: str,
+    bot_o: str,
+    cells: int | tuple[int, int] = 3,
+    win_length: int | None = None,
+    openings: int = 0,
+    rng: random.Random | None = None,
+) -> Board:
+    '''
+    Plays one game between two bots.
+
+    :param bot_x: difficulty of bot playing "X".
+    :param bot_o: difficulty of bot playing "O".
+    :param cells: cells in one row / column or (rows, columns).
+    :param win_length: signs in a row to win.
+    :param openings: count of first random turns to vary games.
+    :param rng: random generator for opening turns.
+    :return: finished board.
+    '''
+    if isinstance(cells, int):
+        cells = (cells, cells)
+    board = Board(*cells, win_length)
+    bots = {
+        'X': make_bot(bot_x, 'X', board),
+        'O': make_bot(bot_o, 'O', board),
+    }
+    rng = rng or random
+    for _ in range(openings):
+        board.turn(*rng.choice(list(board.legal_moves())))
+        if board.result() is not None:
+            return board
+    while board.result() is None:
+        bots[board.get_turn()].turn()
+    return board
+
+
+def _play_chunk(games: int, seed: int, record: bool, *args) -> tuple[dict[str, int], bytes]:
+    '''
+    Plays `games` games in worker process.
+
+    :param record: whether to return encoded games.
+    :return: (score dict as `Game._score`, move log records).
+    '''
+    rng = random.Random(seed)
+    score = {'X': 0, 'O': 0, 'Tie': 0}
+    records = bytearray()
+    for _ in range(games):
+        board = play_game(*args, rng=rng)
+        score[board.result()] += 1
+        if record:
+            records += encode(board)
+    return score, bytes(records)
+
+
+def simulate(
+    games: int,
+    bot_x: str = 'Easy',
+    bot_o: str = 'Easy',
+    cells: int | tuple[int, int] = 3,
+    win_length: int | None = None,
+    openings: int = 0,
+    processes: int | None = None,
+    chunk_size: int = 1000,
+    seed: int = 0,
+    log: MoveLogWriter | None = None,
+) -> Iterator[dict[str, int]]:
+    '''
+    Plays games across process pool.
+
+    :param games: total count of games.
+    :param processes: worker processes, CPU count by default.
+    :param chunk_size: games played by worker at once.
+    :param seed: seed for random opening turns.
+    :param log: writer for played games.
+    :return: generator of total score after every finished chunk.
+    '''
+    score = {'X': 0, 'O': 0, 'Tie': 0}
+    with ProcessPoolExecutor(processes) as pool:
+        futures = [
+            pool.submit(
+                _play_chunk,
+                min(chunk_size, games - start), seed + number, log is not None,
+                bot_x, bot_o, cells, win_length, openings,
+            )
+            for number, start in enumerate(range(0, games, chunk_size))
+        ]
+        for future in as_completed(futures):
+            chunk, records = future.result()
+            for key, val in chunk.items():
+                score[key] += val
+            if log is not None:
+                log.write_records(records)
+            yield dict(score)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Plays bot vs bot games without window.')
+    parser.add_argument('games', type=int)
+    parser.add_argument('--x', default='Easy', choices=DIFFICULTIES, help='bot playing "X"')
+    parser.add_argument('--o', default='Easy', choices=DIFFICULTIES, help='bot playing "O"')
+    parser.add_argument('--cells', type=int, default=3)
+    parser.add_argument('--win-length', type=int, default=None)
+    parser.add_argument('--openings', type=int, default=0, help='random turns at game start')
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--log', default=None, help='file to append played games to')
+    args = parser.parse_args()
+
+    log = MoveLogWriter(args.log) if args.log else None
+    start = time.perf_counter()
+    for score in simulate(
+        args.games, args.x, args.o, args.cells, args.win_length,
+        args.openings, args.processes, args.chunk_size, args.seed, log,
+    ):
+        played = sum(score.values())
+        rate = played / (time.perf_counter() - start)
+        print(
+            f"X: {score['X']:>9} O: {score['O']:>9} Tie: {score['Tie']:>9}"
+            f" | {played}/{args.games} games, {rate:.0f} games/s",
+            flush=True,
+        )
+    if log is not None:
+        log.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+'''
+Import time measurement.
+
+Set TICTACTOE_IMPORT_TIME=1 to print how long every imported module
+took (including its own imports) and time to the first menu frame.
+'''
+import os
+import sys
+import time
+from importlib.abc import MetaPathFinder
+
+START = time.perf_counter()
+ENABLED = bool(os.environ.get('TICTACTOE_IMPORT_TIME'))
+
+
+class ImportTimer(MetaPathFinder):
+    '''
+    Finder wrapping loaders of other finders to time module execution.
+    '''
+
+    def __init__(self) -> None:
+        # (module name, nesting depth, seconds) in import order
+        self.times = []
+        self._depth = 0
+
+    def find_spec(self, name, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is None:
+                continue
+            loader = spec.loader
+            if loader is not None and hasattr(loader, 'exec_module'):
+                spec.loader = _TimedLoader(loader, self)
+            return spec
+        return None
+
+    def record(self, name: str, exec_module, module) -> None:
+        index = len(self.times)
+        self.times.append(None)
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            exec_module(module)
+        finally:
+            self._depth -= 1
+            self.times[index] = (name, self._depth, time.perf_counter() - start)
+
+
+class _TimedLoader:
+    '''
+    Loader proxy timing `exec_module`.
+    '''
+
+    def __init__(self, loader, timer: ImportTimer) -> None:
+        self._loader = loader
+        self._timer = timer
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        self._timer.record(module.__name__, self._loader.exec_module, module)
+
+    def __getattr__(self, name: str):
+        return getattr(self._loader, name)
+
+
+_timer = None
+
+
+def install() -> None:
+    '''
+    Starts timing imports if TICTACTOE_IMPORT_TIME is set.
+    '''
+    global _timer
+    if ENABLED and _timer is None:
+        _timer = ImportTimer()
+        sys.meta_path.insert(0, _timer)
+
+
+def report(event: str) -> None:
+    '''
+    Prints import times and time since start to stderr once.
+
+    :param event: what has just happened, e.g. "menu shown".
+    '''
+    global _timer
+    if _timer is None:
+        return
+    sys.meta_path.remove(_timer)
+    for name, depth, seconds in _timer.times:
+        print(f'{seconds * 1000:9.2f} ms {"  " * depth}{name}', file=sys.stderr)
+    print(f'{event} after {(time.perf_counter() - START) * 1000:.0f} ms', file=sys.stderr)
+    _timer = None
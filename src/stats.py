@@ -0,0 +1,177 @@
+'''
+Persistent game results.
+
+Results are kept in SQLite database in WAL mode. Every game is stored
+in `games` table and added to `totals`, so startup reads only totals.
+Writes are queued and made by background thread in batches.
+'''
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+active = None
+
+# (mode, difficulty, player sign, rows, cols, k)
+Key = tuple[str, str, str, int, int, int]
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    mode TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    sign TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    cols INTEGER NOT NULL,
+    k INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    moves INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS totals (
+    mode TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    sign TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    cols INTEGER NOT NULL,
+    k INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    games INTEGER NOT NULL,
+    moves INTEGER NOT NULL,
+    PRIMARY KEY (mode, difficulty, sign, rows, cols, k, result)
+);
+'''
+
+INSERT_GAME = '''
+INSERT INTO games (time, mode, difficulty, sign, rows, cols, k, result, moves)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+ADD_TOTAL = '''
+INSERT INTO totals (mode, difficulty, sign, rows, cols, k, result, games, moves)
+VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)
+ON CONFLICT (mode, difficulty, sign, rows, cols, k, result)
+DO UPDATE SET games = games + 1, moves = moves + excluded.moves
+'''
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    connection = sqlite3.connect(path)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    return connection
+
+
+class StatsStore:
+    '''
+    Totals of game results kept in memory and written to database in background.
+
+    :param path: database file, created with its directory if it does not exist.
+    :param batch_size: most games written in one transaction.
+    :param interval: seconds to wait for more games before writing batch.
+
+    Failed batches are logged and their games are counted in `lost`,
+    the store keeps writing next ones.
+    '''
+
+    def __init__(self, path: str, batch_size: int = 64, interval: float = 1.0) -> None:
+        self._path = path
+        self._batch_size = batch_size
+        self._interval = interval
+        # key -> {result: games}, key -> total moves
+        self._totals = {}
+        self._moves = {}
+        self.lost = 0
+        connection = _connect(path)
+        with connection:
+            connection.executescript(SCHEMA)
+        for *key, result, games, moves in connection.execute(
+            'SELECT mode, difficulty, sign, rows, cols, k, result, games, moves FROM totals'
+        ):
+            key = tuple(key)
+            self._totals.setdefault(key, {})[result] = games
+            self._moves[key] = self._moves.get(key, 0) + moves
+        connection.close()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._write, daemon=True)
+        self._thread.start()
+
+    def record(self, key: Key, result: str, moves: int) -> None:
+        '''
+        Adds finished game. Returns at once, game is written later.
+
+        :param key: game mode parameters.
+        :param result: 'X', 'O' or 'Tie'.
+        :param moves: count of made turns.
+        :raises ValueError: if key is not (mode, difficulty, sign, rows, cols, k).
+        '''
+        if len(key) != 6:
+            raise ValueError(f'stats key must have 6 items, got {key!r}')
+        totals = self._totals.setdefault(key, {})
+        totals[result] = totals.get(result, 0) + 1
+        self._moves[key] = self._moves.get(key, 0) + moves
+        self._queue.put((time.time(), *key, result, moves))
+
+    def score(self, key: Key) -> dict[str, int]:
+        '''
+        Returns score of all games with key as `Game._score`.
+        '''
+        totals = self._totals.get(key, {})
+        return {result: totals.get(result, 0) for result in ('X', 'O', 'Tie')}
+
+    def mean_moves(self, key: Key) -> float:
+        '''
+        Returns mean length of games with key.
+        '''
+        games = sum(self._totals.get(key, {}).values())
+        return self._moves.get(key, 0) / games if games else 0.0
+
+    def _write(self) -> None:
+        '''
+        Writes queued games in batches.
+        Runs in background thread, None in queue stops it.
+        '''
+        connection = _connect(self._path)
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self._interval
+            while batch[-1] is not None and len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                stop = True
+                batch.pop()
+            if not batch:
+                continue
+            try:
+                with connection:
+                    connection.executemany(INSERT_GAME, batch)
+                    connection.executemany(ADD_TOTAL, [game[1:] for game in batch])
+            except sqlite3.Error:
+                self.lost += len(batch)
+                logger.exception('failed to write %d games to %s', len(batch), self._path)
+        connection.close()
+
+    def close(self) -> None:
+        '''
+        Writes queued games and stops background thread.
+        '''
+        self._queue.put(None)
+        self._thread.join()
+
+
+def open_store(path: str) -> StatsStore:
+    '''
+    Opens store used by games created after this call.
+    '''
+    global active
+    active = StatsStore(path)
+    return active
@@ -0,0 +1,101 @@
+from functools import cache
+
+# cell codes in position keys
+CODES = {None: 0, 'X': 1, 'O': 2}
+
+
+@cache
+def transforms(rows: int, cols: int) -> tuple[tuple[int, ...], ...]:
+    '''
+    Returns symmetry transforms of the board as permutations.
+    Square boards have 8 symmetries (rotations and reflections), other boards have 4.
+    The first transform is identity.
+
+    :param rows: cells along the first board index.
+    :param cols: cells along the second board index.
+    :return: tuple of permutations, `perm[canonical index]` is original cell index.
+    '''
+    maps = [
+        lambda i, j: (i, j),
+        lambda i, j: (rows - 1 - i, j),
+        lambda i, j: (i, cols - 1 - j),
+        lambda i, j: (rows - 1 - i, cols - 1 - j),
+    ]
+    if rows == cols:
+        maps += [
+            lambda i, j: (j, i),
+            lambda i, j: (cols - 1 - j, i),
+            lambda i, j: (j, rows - 1 - i),
+            lambda i, j: (cols - 1 - j, rows - 1 - i),
+        ]
+    perms = []
+    for transform in maps:
+        perm = []
+        for i in range(rows):
+            for j in range(cols):
+                source_i, source_j = transform(i, j)
+                perm.append(source_i * cols + source_j)
+        perms.append(tuple(perm))
+    return tuple(perms)
+
+
+@cache
+def inverses(rows: int, cols: int) -> tuple[tuple[int, ...], ...]:
+    '''
+    Returns inverse permutations of `transforms()`.
+
+    :return: tuple of permutations, `inverse[original index]` is canonical cell index.
+    '''
+    result = []
+    for perm in transforms(rows, cols):
+        inverse = [0] * len(perm)
+        for index, source in enumerate(perm):
+            inverse[source] = index
+        result.append(tuple(inverse))
+    return tuple(result)
+
+
+@cache
+def weights(rows: int, cols: int) -> tuple[tuple[int, ...], ...]:
+    '''
+    Returns weight of every original cell in base-3 key of every transform.
+    Key of transform is a sum of `weights[transform][index] * CODES[sign]`.
+    '''
+    return tuple(
+        tuple(3 ** inverse[index] for index in range(rows * cols))
+        for inverse in inverses(rows, cols)
+    )
+
+
+def canonical(codes: list[int], rows: int, cols: int) -> tuple[int, int]:
+    '''
+    Returns canonical key of position given as flat cell codes.
+    `Board.canonical()` returns it for boards.
+
+    :param codes: flat list of cell codes (see `CODES`).
+    :param rows: cells along the first board index.
+    :param cols: cells along the second board index.
+    :return: (key, transform) where key is the smallest over all transforms.
+    '''
+    keys = [
+        sum(weight[index] * code for index, code in enumerate(codes) if code)
+        for weight in weights(rows, cols)
+    ]
+    transform = min(range(len(keys)), key=keys.__getitem__)
+    return keys[transform], transform
+
+
+def to_canonical(rows: int, cols: int, transform: int, cell: tuple[int, int]) -> tuple[int, int]:
+    '''
+    Maps original cell to coordinates in canonical position.
+    '''
+    i, j = cell
+    return divmod(inverses(rows, cols)[transform][i * cols + j], cols)
+
+
+def from_canonical(rows: int, cols: int, transform: int, cell: tuple[int, int]) -> tuple[int, int]:
+    '''
+    Maps cell in canonical position back to original coordinates.
+    '''
+    i, j = cell
+    return divmod(transforms(rows, cols)[transform][i * cols + j], cols)
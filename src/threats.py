@@ -0,0 +1,141 @@
+from lines import segments, cell_segments
+
+
+class Threats:
+    '''
+    Counts of signs on every winning segment, updated on every placed sign.
+    Open segments (without signs of the other player) with k - 1 and k - 2
+    signs are kept in sets, so winning cells and forks are found without
+    scanning the board.
+
+    :param cells: rows of board cells, owner places signs there before `place()`.
+    :param k: signs in a row to win.
+    '''
+    __slots__ = ('_k', '_segments', '_through', '_cells', 'counts', '_fork_lines', '_win_lines')
+
+    def __init__(self, cells: list[list[str | None]], k: int) -> None:
+        rows, cols = len(cells), len(cells[0])
+        self._k = k
+        self._segments = segments(rows, cols, k)
+        self._through = cell_segments(rows, cols, k)
+        self._cells = cells
+        self.counts = {
+            'X': [0] * len(self._segments),
+            'O': [0] * len(self._segments),
+        }
+        # segments with k - 2 and k - 1 signs and no other signs
+        lines = range(len(self._segments))
+        self._fork_lines = {sign: set(lines) if k == 2 else set() for sign in ('X', 'O')}
+        self._win_lines = {sign: set(lines) if k == 1 else set() for sign in ('X', 'O')}
+
+    def place(self, i: int, j: int, sign: str) -> bool:
+        '''
+        Updates segments passing through (i, j) after sign was placed there.
+
+        :return: True if sign got k in a row.
+        '''
+        k = self._k
+        other = 'O' if sign == 'X' else 'X'
+        counts, other_counts = self.counts[sign], self.counts[other]
+        fork_lines, win_lines = self._fork_lines[sign], self._win_lines[sign]
+        won = False
+        for line in self._through[i][j]:
+            count = counts[line] + 1
+            counts[line] = count
+            other_count = other_counts[line]
+            if other_count == 0:
+                if count == k - 2:
+                    fork_lines.add(line)
+                elif count == k - 1:
+                    fork_lines.discard(line)
+                    win_lines.add(line)
+                elif count == k:
+                    win_lines.discard(line)
+                    won = True
+            if count == 1:
+                # the line is closed for the other sign
+                if other_count == k - 1:
+                    self._win_lines[other].discard(line)
+                elif other_count == k - 2:
+                    self._fork_lines[other].discard(line)
+        return won
+
+    def remove(self, i: int, j: int, sign: str) -> None:
+        '''
+        Updates segments passing through (i, j) after sign was removed from there.
+        '''
+        k = self._k
+        other = 'O' if sign == 'X' else 'X'
+        counts, other_counts = self.counts[sign], self.counts[other]
+        fork_lines, win_lines = self._fork_lines[sign], self._win_lines[sign]
+        for line in self._through[i][j]:
+            count = counts[line]
+            counts[line] = count - 1
+            other_count = other_counts[line]
+            if other_count == 0:
+                if count == k:
+                    win_lines.add(line)
+                elif count == k - 1:
+                    win_lines.discard(line)
+                    fork_lines.add(line)
+                elif count == k - 2:
+                    fork_lines.discard(line)
+            if count == 1:
+                # the line is open for the other sign again
+                if other_count == k - 1:
+                    self._win_lines[other].add(line)
+                elif other_count == k - 2:
+                    self._fork_lines[other].add(line)
+
+    def _empty_cells(self, line: int) -> list[tuple[int, int]]:
+        cells = self._cells
+        return [(i, j) for i, j in self._segments[line] if cells[i][j] is None]
+
+    def winning_cells(self, sign: str) -> list[tuple[int, int]]:
+        '''
+        Returns cells completing k in a row for sign, sorted.
+        '''
+        return sorted({
+            cell
+            for line in self.open_lines(sign, self._k - 1)
+            for cell in self._empty_cells(line)
+        })
+
+    def forks(self, sign: str) -> list[tuple[int, int]]:
+        '''
+        Returns cells giving sign two winning cells at once, sorted.
+        '''
+        if self._k < 2:
+            return []
+        # cell -> winning cells created by sign placed there
+        wins = {}
+        for line in self.open_lines(sign, self._k - 2):
+            first, second = self._empty_cells(line)
+            wins.setdefault(first, set()).add(second)
+            wins.setdefault(second, set()).add(first)
+        return sorted(cell for cell, cells in wins.items() if len(cells) >= 2)
+
+    def open_lines(self, sign: str, count: int) -> set[int]:
+        '''
+        Returns indexes of segments with `count` signs and no other signs.
+        Only k - 1 and k - 2 counts are kept. Set must not be modified.
+        '''
+        if count == self._k - 1:
+            return self._win_lines[sign]
+        if count == self._k - 2:
+            return self._fork_lines[sign]
+        raise ValueError(f'segments with {count} signs are not kept')
+
+
+def scan(board) -> Threats:
+    '''
+    Counts signs of board without its own counters, e.g. `BitBoard`.
+    '''
+    rows, cols = board.get_shape()
+    cells = [list(board.get_row(i)) for i in range(rows)]
+    threats = Threats(cells, board.get_k())
+    for i in range(rows):
+        for j in range(cols):
+            if (sign := cells[i][j]) is not None:
+                threats.place(i, j, sign)
+    return threats
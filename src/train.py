@@ -0,0 +1,226 @@
+'''
+Self-play training of pattern weights for `learnedbot.LearnedBot`.
+
+Workers play games with current weights and learn by TD(0), their weight
+changes are averaged after every round of chunks.
+
+Usage:
+    python train.py 7 7 5 100000 --processes 8
+    python train.py 7 7 5 100000 --resume
+'''
+import argparse
+import math
+import os
+import random
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from board import Board
+from lines import nearby_only, segments
+from patterns import PatternWeights, cell_powers, collapse, expand, features, gain, write_weights
+
+OTHER = {'X': 'O', 'O': 'X'}
+
+
+def _sigmoid(value: float) -> float:
+    return 1 / (1 + math.exp(-max(min(value, 30.0), -30.0)))
+
+
+class Learner:
+    '''
+    Learns pattern weights by playing against itself.
+    Turns winning at once or blocking such win are always made.
+    Value of position is expected score (1 for win, 0.5 for tie) of the player
+    who made the last turn, sigmoid of sum of pattern weights.
+
+    :param weights: weights of `patterns.features()`.
+    :param alpha: learning rate.
+    :param epsilon: probability of random turn.
+    '''
+
+    def __init__(
+        self,
+        rows: int,
+        cols: int,
+        k: int,
+        weights: list[float],
+        alpha: float = 0.1,
+        epsilon: float = 0.1,
+    ) -> None:
+        self._shape = (rows, cols, k)
+        self._powers = cell_powers(rows, cols, k)
+        self._lines = len(segments(rows, cols, k))
+        self._feature = features(k)[0]
+        self._nearby = nearby_only(rows, cols)
+        self._alpha = alpha
+        self._epsilon = epsilon
+        self.weights = list(weights)
+
+    def play(self, rng: random.Random) -> str:
+        '''
+        Plays one game, updating weights after every turn.
+        Turns are chosen with weights from the game start.
+
+        :return: game result.
+        '''
+        rows, cols, k = self._shape
+        board = Board(rows, cols, k)
+        table = expand(self.weights, k)
+        weights, feature, powers = self.weights, self._feature, self._powers
+        # patterns and counts of features for every player
+        codes = {'X': [0] * self._lines, 'O': [0] * self._lines}
+        counts = {'X': [0] * len(weights), 'O': [0] * len(weights)}
+        value = None
+        while (result := board.result()) is None:
+            turn = board.get_turn()
+            other = OTHER[turn]
+            moves = list(board.legal_moves(nearby=self._nearby))
+            threats = board.get_threats()
+            if rng.random() < self._epsilon:
+                i, j = rng.choice(moves)
+            elif (forced := threats.winning_cells(turn) or threats.winning_cells(other)):
+                # immediate wins and blocks are not left to weights
+                i, j = forced[0]
+            else:
+                player_codes = codes[turn]
+                i, j = max(moves, key=lambda cell: gain(table, player_codes, powers[cell[0] * cols + cell[1]]))
+            previous = counts[other][:]
+            board.push(i, j)
+            for player, code in ((turn, 1), (other, 2)):
+                player_codes, player_counts = codes[player], counts[player]
+                for line, power in powers[i * cols + j]:
+                    old = player_codes[line]
+                    new = player_codes[line] = old + power * code
+                    if (number := feature[old]) is not None:
+                        player_counts[number] -= 1
+                    player_counts[feature[new]] += 1
+            current = _sigmoid(sum(w * count for w, count in zip(weights, counts[turn]) if count))
+            if (result := board.result()) is None:
+                target = current
+            else:
+                target = 0.5 if result == 'Tie' else 1.0
+                self._update(counts[turn], current, target)
+            if value is not None:
+                self._update(previous, value, 1 - target)
+            value = current
+        return result
+
+    def _update(self, counts: list[int], value: float, target: float) -> None:
+        '''
+        Moves value of position with feature `counts` towards target.
+        '''
+        step = self._alpha * (target - value) * value * (1 - value)
+        weights = self.weights
+        for number, count in enumerate(counts):
+            if count:
+                weights[number] += step * count
+
+
+def _train_chunk(
+    weights: list[float],
+    games: int,
+    seed: int,
+    rows: int,
+    cols: int,
+    k: int,
+    alpha: float,
+    epsilon: float,
+) -> tuple[list[float], dict[str, int]]:
+    '''
+    Plays `games` games in worker process.
+
+    :return: (change of weights, score dict as `Game._score`).
+    '''
+    learner = Learner(rows, cols, k, weights, alpha, epsilon)
+    rng = random.Random(seed)
+    score = {'X': 0, 'O': 0, 'Tie': 0}
+    for _ in range(games):
+        score[learner.play(rng)] += 1
+    return [new - old for new, old in zip(learner.weights, weights)], score
+
+
+def train(
+    rows: int,
+    cols: int,
+    k: int,
+    games: int,
+    weights: list[float] | None = None,
+    alpha: float = 0.1,
+    epsilon: float = 0.1,
+    processes: int | None = None,
+    chunk_size: int = 200,
+    seed: int = 0,
+) -> Iterator[tuple[int, list[float], dict[str, int]]]:
+    '''
+    Trains weights across process pool.
+
+    :param games: total count of games.
+    :param weights: weights of `patterns.features()` to start from, zeros by default.
+    :param processes: worker processes, CPU count by default.
+    :param chunk_size: games played by worker between weight averaging.
+    :param seed: seed for random turns.
+    :return: generator of (played games, weights, score) after every round.
+    '''
+    weights = list(weights) if weights is not None else [0.0] * features(k)[1]
+    processes = processes or os.cpu_count() or 1
+    score = {'X': 0, 'O': 0, 'Tie': 0}
+    played = 0
+    number = 0
+    with ProcessPoolExecutor(processes) as pool:
+        while played < games:
+            chunks = []
+            while len(chunks) < processes and played + sum(chunks) < games:
+                chunks.append(min(chunk_size, games - played - sum(chunks)))
+            futures = [
+                pool.submit(_train_chunk, weights, chunk, seed + number + n, rows, cols, k, alpha, epsilon)
+                for n, chunk in enumerate(chunks)
+            ]
+            number += len(chunks)
+            for future in futures:
+                delta, chunk_score = future.result()
+                for key, val in chunk_score.items():
+                    score[key] += val
+                weights = [w + d / len(chunks) for w, d in zip(weights, delta)]
+            played += sum(chunks)
+            yield played, weights, dict(score)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Learns pattern weights by self-play.')
+    parser.add_argument('rows', type=int)
+    parser.add_argument('cols', type=int)
+    parser.add_argument('k', type=int)
+    parser.add_argument('games', type=int)
+    parser.add_argument('--alpha', type=float, default=0.1, help='learning rate')
+    parser.add_argument('--epsilon', type=float, default=0.1, help='probability of random turn')
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help='weights file, in `patterns.WEIGHTS_DIR` by default')
+    parser.add_argument('--resume', action='store_true', help='continue training weights from output file')
+    args = parser.parse_args()
+
+    path = args.output or PatternWeights.path(args.rows, args.cols, args.k)
+    weights, trained = None, 0
+    if args.resume:
+        stored = PatternWeights(path)
+        weights, trained = collapse(stored.table, args.k), stored.games
+
+    start = time.perf_counter()
+    for played, weights, score in train(
+        args.rows, args.cols, args.k, args.games, weights, args.alpha,
+        args.epsilon, args.processes, args.chunk_size, args.seed,
+    ):
+        rate = played / (time.perf_counter() - start)
+        print(
+            f"X: {score['X']:>9} O: {score['O']:>9} Tie: {score['Tie']:>9}"
+            f" | {played}/{args.games} games, {rate:.0f} games/s",
+            flush=True,
+        )
+    if weights is not None:
+        write_weights(path, args.rows, args.cols, args.k, expand(weights, args.k), trained + args.games)
+        print(f'Weights written to {path}')
+
+
+if __name__ == '__main__':
+    main()
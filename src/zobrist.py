@@ -0,0 +1,64 @@
+import random
+from functools import cache
+from symmetry import inverses
+
+
+@cache
+def zobrist_keys(rows: int, cols: int) -> dict[str, tuple[tuple[int, ...], ...]]:
+    '''
+    Returns random 64-bit keys for every (sign, cell) pair.
+    Keys are seeded by board shape, so they are the same between runs.
+
+    :param rows: cells along the first board index.
+    :param cols: cells along the second board index.
+    :return: `keys[sign][i][j]` to xor into position hash.
+    '''
+    rng = random.Random(f'{rows}x{cols}')
+    return {
+        sign: tuple(
+            tuple(rng.getrandbits(64) for _ in range(cols))
+            for _ in range(rows)
+        )
+        for sign in ('X', 'O')
+    }
+
+
+@cache
+def symmetric_keys(rows: int, cols: int) -> tuple[dict[str, tuple[int, ...]], ...]:
+    '''
+    Returns Zobrist keys of every symmetry transform of the board.
+    The smallest of position hashes over all transforms is the same
+    for positions equal up to rotations and reflections.
+
+    :param rows: cells along the first board index.
+    :param cols: cells along the second board index.
+    :return: `keys[transform][sign][i * cols + j]` to xor into transform hash.
+    '''
+    keys = zobrist_keys(rows, cols)
+    flat = {sign: [key for row in keys[sign] for key in row] for sign in keys}
+    return tuple(
+        {
+            sign: tuple(flat[sign][inverse[index]] for index in range(rows * cols))
+            for sign in flat
+        }
+        for inverse in inverses(rows, cols)
+    )
+
+
+@cache
+def cell_keys(rows: int, cols: int) -> dict[str, tuple[tuple[int, ...], ...]]:
+    '''
+    Returns Zobrist keys of every cell for all symmetry transforms.
+
+    :param rows: cells along the first board index.
+    :param cols: cells along the second board index.
+    :return: `keys[sign][i * cols + j]` is a tuple of keys to xor into every transform hash.
+    '''
+    keys = symmetric_keys(rows, cols)
+    return {
+        sign: tuple(
+            tuple(transform[sign][index] for transform in keys)
+            for index in range(rows * cols)
+        )
+        for sign in ('X', 'O')
+    }
@@ -0,0 +1,81 @@
+import pickle
+import random
+import pytest
+from board import Board
+from bitboard import BitBoard
+
+
+def rebuild(board: Board) -> Board:
+    rows, cols = board.get_shape()
+    fresh = Board(rows, cols, board.get_k())
+    for cell in board.get_moves():
+        fresh.push(*cell)
+    return fresh
+
+
+def assert_same(board: Board, fresh: Board) -> None:
+    assert list(board) == list(fresh)
+    assert board.get_turn() == fresh.get_turn()
+    assert board.result() == fresh.result()
+    assert board.count_empty() == fresh.count_empty()
+    assert board.canonical() == fresh.canonical()
+    assert board.zobrist() == fresh.zobrist()
+    for nearby in (False, True):
+        # undone turns change order of unordered moves only
+        assert sorted(board.legal_moves(nearby)) == sorted(fresh.legal_moves(nearby))
+        assert list(board.legal_moves(nearby, ordered=True)) == list(fresh.legal_moves(nearby, ordered=True))
+    threats, fresh_threats = board.get_threats(), fresh.get_threats()
+    assert threats.counts == fresh_threats.counts
+    for sign in ('X', 'O'):
+        assert threats.winning_cells(sign) == fresh_threats.winning_cells(sign)
+        assert threats.forks(sign) == fresh_threats.forks(sign)
+        for count in {board.get_k() - 1, board.get_k() - 2} - {-1}:
+            assert threats.open_lines(sign, count) == fresh_threats.open_lines(sign, count)
+
+
+@pytest.mark.parametrize('shape', [(3, 3, 3), (4, 4, 3), (3, 5, 3), (7, 7, 5)])
+def test_push_pop_matches_rebuild(shape):
+    rng = random.Random(0)
+    rows, cols, _ = shape
+    for _ in range(20):
+        board = Board(*shape)
+        for _ in range(3 * rows * cols):
+            if board.get_moves() and (board.result() is not None or rng.random() < 0.4):
+                cell = board.get_moves()[-1]
+                assert board.pop() == cell
+            else:
+                board.push(*rng.choice(list(board.legal_moves())))
+            assert_same(board, rebuild(board))
+        while board.get_moves():
+            board.pop()
+        assert_same(board, Board(*shape))
+
+
+def test_push_occupied_cell():
+    board = Board(3, 3, 3)
+    board.push(1, 1)
+    with pytest.raises(ValueError):
+        board.push(1, 1)
+    assert board.turn(1, 1) == 'O'
+    assert board.get_moves() == [(1, 1)]
+
+
+def test_compact_forms_round_trip():
+    rng = random.Random(1)
+    for shape in [(3, 3, 3), (7, 7, 5), (15, 15, 5)]:
+        board = Board(*shape)
+        for _ in range(rng.randrange(shape[0] * shape[1])):
+            if board.result() is not None:
+                break
+            board.push(*rng.choice(list(board.legal_moves())))
+        assert_same(pickle.loads(pickle.dumps(board)), board)
+        bits = BitBoard(*shape)
+        for cell in board.get_moves():
+            bits.turn(*cell)
+        for nearby in (False, True):
+            for ordered in (False, True):
+                assert list(bits.legal_moves(nearby, ordered)) == list(board.legal_moves(nearby, ordered))
+        restored = BitBoard.from_bytes(bits.to_bytes())
+        assert list(restored) == list(board)
+        assert restored.get_turn() == board.get_turn()
+        assert restored.result() == board.result()
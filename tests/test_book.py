@@ -0,0 +1,50 @@
+import random
+from board import Board
+from book import OpeningBook
+
+
+def negamax(board: Board, table: dict) -> int:
+    '''
+    Exact value for side to move as in `buildbook.Solver`: win is 1 + empty cells left.
+    '''
+    key = tuple(board)
+    if key in table:
+        return table[key]
+    empty = board.count_empty()
+    best = None
+    for cell in list(board.legal_moves()):
+        board.push(*cell)
+        if board.result() not in (None, 'Tie'):
+            value = empty
+        elif empty == 1:
+            value = 0
+        else:
+            value = -negamax(board, table)
+        board.pop()
+        best = value if best is None else max(best, value)
+    table[key] = best
+    return best
+
+
+def test_book_matches_negamax():
+    book = OpeningBook.load(3, 3, 3)
+    assert book is not None
+    rng = random.Random(0)
+    table = {}
+    probes = 0
+    for _ in range(40):
+        board = Board(3, 3, 3)
+        while board.result() is None:
+            if (entry := book.lookup(board)) is not None:
+                move, value = entry
+                assert value == negamax(board, table)
+                empty = board.count_empty()
+                board.push(*move)
+                if board.result() not in (None, 'Tie'):
+                    assert value == empty
+                elif empty > 1:
+                    assert value == -negamax(board, table)
+                board.pop()
+                probes += 1
+            board.turn(*rng.choice(list(board.legal_moves())))
+    assert probes > 100
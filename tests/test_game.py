@@ -0,0 +1,30 @@
+import os
+import time
+import pytest
+
+pygame = pytest.importorskip('pygame')
+
+
+@pytest.fixture
+def display():
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    pygame.init()
+    yield pygame.display.set_mode((240, 260))
+    pygame.quit()
+
+
+def test_close_button_cancels_bot_search(display):
+    from gameplayerbot import GamePlayerBot
+
+    game = GamePlayerBot(240, 260, 10, 'O', (15, 15), 5, 'Hard')
+    game._surface = display
+    game._bot._time_limit = 60.0
+    game.start()
+    assert game._thinking is not None
+    # let search start
+    time.sleep(0.1)
+    start = time.perf_counter()
+    with pytest.raises(SystemExit):
+        game.handle_event(pygame.event.Event(pygame.QUIT))
+    game._executor.shutdown(wait=True)
+    assert time.perf_counter() - start < 5
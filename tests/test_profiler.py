@@ -0,0 +1,11 @@
+import json
+from profiler import Profiler
+
+
+def test_stats_file_directory_is_created(tmp_path):
+    path = tmp_path / 'data' / 'profile.jsonl'
+    profiler = Profiler(str(path))
+    profiler.record('draw', 0.002)
+    profiler.write()
+    (line,) = path.read_text().splitlines()
+    assert 'draw' in json.dumps(json.loads(line))
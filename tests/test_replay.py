@@ -0,0 +1,88 @@
+import random
+import pytest
+from board import Board
+from replay import MoveLogWriter, encode, encode_moves, read_games, replay
+
+
+def random_game(rng: random.Random, rows: int, cols: int, k: int, finish: bool = True) -> Board:
+    board = Board(rows, cols, k)
+    cells = [(i, j) for i in range(rows) for j in range(cols)]
+    rng.shuffle(cells)
+    for cell in cells:
+        if board.result() is not None or not finish and rng.random() < 0.1:
+            break
+        board.turn(*cell)
+    return board
+
+
+def test_log_round_trip(tmp_path):
+    rng = random.Random(0)
+    shapes = [(3, 3, 3), (4, 4, 3), (7, 7, 5), (16, 16, 5), (3, 5, 3)]
+    games = [random_game(rng, *rng.choice(shapes), finish=rng.random() < 0.8) for _ in range(200)]
+    path = str(tmp_path / 'games.log')
+    with MoveLogWriter(path, buffer_size=64) as log:
+        for board in games[:100]:
+            log.write(board)
+    # appending reopens the file without second header
+    with MoveLogWriter(path) as log:
+        log.write_records(b''.join(encode(board) for board in games[100:]))
+
+    records = list(read_games(path, buffer_size=16))
+    assert len(records) == len(games)
+    for (rows, cols, k, moves), board in zip(records, games):
+        assert (rows, cols) == board.get_shape() and k == board.get_k()
+        assert [divmod(move, cols) for move in moves] == board.get_moves()
+    for replayed, board in zip(replay(path), games):
+        assert replayed.get_moves() == board.get_moves()
+        assert replayed.result() == board.result()
+        assert list(replayed) == list(board)
+
+
+def test_cut_record_is_skipped(tmp_path):
+    path = str(tmp_path / 'games.log')
+    board = random_game(random.Random(1), 3, 3, 3)
+    with MoveLogWriter(path) as log:
+        log.write(board)
+        log.write(board)
+    with open(path, 'r+b') as file:
+        file.truncate(file.seek(0, 2) - 1)
+    assert len(list(replay(path))) == 1
+
+
+def test_append_after_cut_record(tmp_path):
+    path = str(tmp_path / 'games.log')
+    rng = random.Random(2)
+    games = [random_game(rng, 3, 3, 3) for _ in range(5)]
+    with MoveLogWriter(path) as log:
+        for board in games[:2]:
+            log.write(board)
+    for cut in (1, 2, len(games[1].get_moves()) + 4):
+        with open(path, 'r+b') as file:
+            file.truncate(file.seek(0, 2) - cut)
+        with MoveLogWriter(path) as log:
+            log.write(games[1])
+    with MoveLogWriter(path) as log:
+        for board in games[2:]:
+            log.write(board)
+    replayed = list(replay(path))
+    assert [board.get_moves() for board in replayed] == [board.get_moves() for board in games]
+    assert [board.result() for board in replayed] == [board.result() for board in games]
+
+
+def test_repeated_cell_is_error(tmp_path):
+    path = str(tmp_path / 'games.log')
+    with MoveLogWriter(path) as log:
+        log.write_records(encode_moves(3, 3, 3, bytes([0, 3, 1, 3])))
+    with pytest.raises(ValueError):
+        list(replay(path))
+
+
+def test_bad_file(tmp_path):
+    path = tmp_path / 'games.log'
+    path.write_bytes(b'not a log')
+    with pytest.raises(ValueError):
+        list(read_games(str(path)))
+    with pytest.raises(ValueError):
+        MoveLogWriter(str(path))
+    with pytest.raises(ValueError):
+        encode(Board(17, 17, 5))
@@ -0,0 +1,12 @@
+from board import Board
+from searchbot import SearchBot
+
+
+def test_node_budget():
+    board = Board(7, 7, 5)
+    board.turn(3, 3)
+    bot = SearchBot('O', board, time_limit=60.0, max_nodes=500)
+    assert bot.get_move() is not None
+    # budget is checked every 64 positions
+    assert bot.stats['nodes'] < 500 + 64
+    assert bot.stats['depth'] >= 1
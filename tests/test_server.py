@@ -0,0 +1,132 @@
+import asyncio
+from replay import MoveLogWriter, read_games
+from server import GameServer
+
+
+async def connect(port: int) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    return await asyncio.open_connection('127.0.0.1', port)
+
+
+async def send(writer: asyncio.StreamWriter, line: str | bytes) -> None:
+    writer.write((line.encode() if isinstance(line, str) else line) + b'\n')
+    await writer.drain()
+
+
+async def receive(reader: asyncio.StreamReader) -> list[str]:
+    return (await asyncio.wait_for(reader.readline(), 5)).decode().split()
+
+
+async def start_game(port: int, shape: str = '3 3 3') -> tuple:
+    x_reader, x_writer = await connect(port)
+    await send(x_writer, f'JOIN {shape}')
+    assert await receive(x_reader) == ['WAIT']
+    o_reader, o_writer = await connect(port)
+    await send(o_writer, f'JOIN {shape}')
+    assert await receive(x_reader) == ['START', 'X', *shape.split()]
+    assert await receive(o_reader) == ['START', 'O', *shape.split()]
+    return (x_reader, x_writer), (o_reader, o_writer)
+
+
+def test_game_to_result(tmp_path):
+    async def run():
+        log = MoveLogWriter(str(tmp_path / 'games.log'))
+        server = GameServer(log=log)
+        _, port = await server.start(port=0)
+        (x_reader, x_writer), (o_reader, o_writer) = await start_game(port)
+        assert server.sessions == 1
+        players = [(x_reader, x_writer), (o_reader, o_writer)]
+        for number, (i, j) in enumerate([(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)]):
+            await send(players[number % 2][1], f'MOVE {i} {j}')
+            for reader, _ in players:
+                assert await receive(reader) == ['MOVE', str(i), str(j)]
+        for reader, _ in players:
+            assert await receive(reader) == ['RESULT', 'X']
+        assert server.sessions == 0
+        for _, writer in players:
+            writer.close()
+        await server.close()
+        log.close()
+
+    asyncio.run(run())
+    assert list(read_games(str(tmp_path / 'games.log'))) == [(3, 3, 3, bytes([0, 3, 1, 4, 2]))]
+
+
+def test_illegal_moves():
+    async def run():
+        server = GameServer()
+        _, port = await server.start(port=0)
+        (x_reader, x_writer), (o_reader, o_writer) = await start_game(port)
+        await send(o_writer, 'MOVE 0 0')
+        assert await receive(o_reader) == ['ERROR', 'not', 'your', 'turn']
+        await send(x_writer, 'MOVE 3 0')
+        assert await receive(x_reader) == ['ERROR', 'bad', 'cell']
+        await send(x_writer, 'MOVE a 0')
+        assert await receive(x_reader) == ['ERROR', 'bad', 'number']
+        await send(x_writer, 'JUMP')
+        assert await receive(x_reader) == ['ERROR', 'unknown', 'command']
+        await send(x_writer, 'MOVE 1 1')
+        assert await receive(x_reader) == ['MOVE', '1', '1']
+        assert await receive(o_reader) == ['MOVE', '1', '1']
+        await send(o_writer, 'MOVE 1 1')
+        assert await receive(o_reader) == ['ERROR', 'bad', 'cell']
+        x_writer.close()
+        o_writer.close()
+        await server.close()
+
+    asyncio.run(run())
+
+
+def test_line_over_max_line():
+    async def run():
+        server = GameServer(max_line=64)
+        _, port = await server.start(port=0)
+        (x_reader, x_writer), (o_reader, o_writer) = await start_game(port)
+        await send(x_writer, b'MOVE ' + b'1' * 100)
+        assert await receive(x_reader) == ['ERROR', 'line', 'too', 'long']
+        assert await x_reader.read() == b''
+        assert await receive(o_reader) == ['LEFT']
+        assert server.sessions == 0
+        o_writer.close()
+        await server.close()
+
+    asyncio.run(run())
+
+
+def test_disconnect_mid_game():
+    async def run():
+        server = GameServer()
+        _, port = await server.start(port=0)
+        (x_reader, x_writer), (o_reader, o_writer) = await start_game(port)
+        await send(x_writer, 'MOVE 0 0')
+        assert await receive(o_reader) == ['MOVE', '0', '0']
+        x_writer.close()
+        assert await receive(o_reader) == ['LEFT']
+        assert server.sessions == 0
+        await send(o_writer, 'MOVE 1 1')
+        assert await receive(o_reader) == ['ERROR', 'not', 'in', 'game']
+        o_writer.close()
+        await server.close()
+
+    asyncio.run(run())
+
+
+def test_close_with_connected_clients(caplog):
+    async def run():
+        server = GameServer()
+        _, port = await server.start(port=0)
+        (x_reader, x_writer), (o_reader, o_writer) = await start_game(port)
+        waiting_reader, waiting_writer = await connect(port)
+        await send(waiting_writer, 'JOIN 4 4 3')
+        assert await receive(waiting_reader) == ['WAIT']
+        tasks = set(server._tasks)
+        assert len(tasks) == 3
+        await server.close()
+        assert all(task.done() for task in tasks)
+        assert not server._tasks
+        for reader in (x_reader, o_reader, waiting_reader):
+            assert await asyncio.wait_for(reader.read(), 5) in (b'', b'LEFT\n')
+        for writer in (x_writer, o_writer, waiting_writer):
+            writer.close()
+
+    asyncio.run(run())
+    assert not [record for record in caplog.records if record.name == 'asyncio']
@@ -0,0 +1,67 @@
+import random
+import pytest
+import sqlite3
+from stats import StatsStore
+
+
+def test_totals_after_reopen(tmp_path):
+    path = str(tmp_path / 'stats.sqlite3')
+    rng = random.Random(0)
+    keys = [
+        ('Bot', 'Easy', 'X', 3, 3, 3),
+        ('Bot', 'Hard', 'O', 7, 7, 5),
+        ('PvP', '', 'X', 3, 5, 3),
+    ]
+    games = [(rng.choice(keys), rng.choice(('X', 'O', 'Tie')), rng.randrange(5, 30)) for _ in range(300)]
+
+    store = StatsStore(path, batch_size=16, interval=0.01)
+    for game in games[:200]:
+        store.record(*game)
+    store.close()
+    store = StatsStore(path)
+    for game in games[200:]:
+        store.record(*game)
+    store.close()
+
+    store = StatsStore(path)
+    for key in keys:
+        played = [(result, moves) for game_key, result, moves in games if game_key == key]
+        assert store.score(key) == {result: [r for r, _ in played].count(result) for result in ('X', 'O', 'Tie')}
+        assert store.mean_moves(key) == sum(moves for _, moves in played) / len(played)
+    assert store.score(('Bot', 'Medium', 'X', 3, 3, 3)) == {'X': 0, 'O': 0, 'Tie': 0}
+    assert store.mean_moves(('Bot', 'Medium', 'X', 3, 3, 3)) == 0.0
+    store.close()
+
+    connection = sqlite3.connect(path)
+    assert connection.execute('SELECT COUNT(*) FROM games').fetchone() == (len(games),)
+    connection.close()
+
+
+def test_failed_batch_is_logged(tmp_path, caplog):
+    path = str(tmp_path / 'stats.sqlite3')
+    key = ('Bot', 'Easy', 'X', 3, 3, 3)
+    store = StatsStore(path, batch_size=1, interval=0.01)
+    # values sqlite cannot bind fail the whole batch
+    store.record(('Bot', object(), 'X', 3, 3, 3), 'X', 5)
+    store.record(key, 'O', 6)
+    store.close()
+    assert store.lost == 1
+    assert 'failed to write 1 games' in caplog.text
+    store = StatsStore(path)
+    assert store.score(key) == {'X': 0, 'O': 1, 'Tie': 0}
+    store.close()
+
+
+def test_bad_key(tmp_path):
+    store = StatsStore(str(tmp_path / 'stats.sqlite3'))
+    with pytest.raises(ValueError):
+        store.record(('Bot', 'Easy', 'X', 3, 3), 'X', 5)
+    store.close()
+    assert store.score(('Bot', 'Easy', 'X', 3, 3)) == {'X': 0, 'O': 0, 'Tie': 0}
+
+
+def test_database_directory_is_created(tmp_path):
+    path = tmp_path / 'data' / 'stats.sqlite3'
+    store = StatsStore(str(path))
+    store.close()
+    assert path.exists()
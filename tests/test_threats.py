@@ -0,0 +1,60 @@
+import random
+from board import Board
+from bot import Bot
+
+
+def play(board: Board, cells: list[tuple[int, int]]) -> Board:
+    for cell in cells:
+        board.push(*cell)
+    return board
+
+
+def scan_forks(board: Board, sign: str) -> list[tuple[int, int]]:
+    '''
+    Finds forks by placing sign on every empty cell and counting winning cells.
+    '''
+    k = board.get_k()
+    forks = []
+    for cell in board.legal_moves():
+        wins = set()
+        for segment in board.get_segments():
+            if cell not in segment:
+                continue
+            signs = [board.get(*other) for other in segment if other != cell]
+            if signs.count(sign) == k - 2 and signs.count(None) == 1:
+                wins.update(other for other in segment if other != cell and board.get(*other) is None)
+        if len(wins) >= 2:
+            forks.append(cell)
+    return sorted(forks)
+
+
+def test_overlapping_windows_are_not_fork():
+    board = play(Board(6, 6, 4), [(0, 0), (5, 5), (0, 2), (5, 3), (0, 4), (3, 5)])
+    assert board.get_threats().forks('X') == [(0, 3)]
+    assert Bot('X', board).get_move() == (0, 3)
+
+
+def test_forks_match_scan():
+    rng = random.Random(0)
+    for shape in ((3, 3, 3), (4, 4, 3), (6, 6, 4), (7, 7, 5)):
+        for _ in range(30):
+            board = Board(*shape)
+            while board.result() is None:
+                board.push(*rng.choice(list(board.legal_moves())))
+                for sign in ('X', 'O'):
+                    assert board.get_threats().forks(sign) == scan_forks(board, sign)
+
+
+def test_bot_plays_on_bitboard():
+    from bitboard import BitBoard
+
+    for shape in ((3, 3, 3), (6, 6, 4)):
+        board, bits = Board(*shape), BitBoard(*shape)
+        bots = {sign: Bot(sign, board) for sign in ('X', 'O')}
+        bit_bots = {sign: Bot(sign, bits) for sign in ('X', 'O')}
+        while board.result() is None:
+            cell = bots[board.get_turn()].get_move()
+            assert bit_bots[bits.get_turn()].get_move() == cell
+            board.turn(*cell)
+            bits.turn(*cell)
+        assert bits.result() == board.result()